@@ -10,7 +10,7 @@ templates = Jinja2Templates(directory='templates')
 
 # 회원가입
 @router.post("/signup/")
-async def signup(signup_data: UserCreate, db: Session = Depends(get_db)):
+def signup(signup_data: UserCreate, db: Session = Depends(get_db)):
     # 먼저 username이 이미 존재하는지 확인
     existing_user = db.query(User).filter(User.username == signup_data.username).first()
     if existing_user:
@@ -35,7 +35,7 @@ async def signup(signup_data: UserCreate, db: Session = Depends(get_db)):
 
 # 로그인
 @router.post("/login/")
-async def login(request: Request, signin_data: UserLogin, db: Session = Depends(get_db)):
+def login(request: Request, signin_data: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.username == signin_data.username).first()
     if user and verify_password(signin_data.password, user.hashed_password):
         request.session['username'] = user.username
@@ -51,7 +51,7 @@ async def logout(request: Request):
 
 # 메모 생성
 @router.post("/memos/")
-async def create_memo(request: Request, memo: MemoCreate, db: Session = Depends(get_db)):
+def create_memo(request: Request, memo: MemoCreate, db: Session = Depends(get_db)):
     username = request.session.get('username')
     if username is None:
         raise HTTPException(status_code=401, detail="Not authorized")
@@ -66,7 +66,7 @@ async def create_memo(request: Request, memo: MemoCreate, db: Session = Depends(
 
 # 메모 조회
 @router.get("/memos/")
-async def list_memos(request: Request, db: Session = Depends(get_db)):
+def list_memos(request: Request, db: Session = Depends(get_db)):
     username = request.session.get('username')
     if username is None:
         raise HTTPException(status_code=401, detail="Not authorized")
@@ -78,7 +78,7 @@ async def list_memos(request: Request, db: Session = Depends(get_db)):
 
 # 메모 업데이트
 @router.put("/memos/{memo_id}")
-async def update_memo(request: Request, memo_id: int, memo: MemoUpdate, db: Session = Depends(get_db)):
+def update_memo(request: Request, memo_id: int, memo: MemoUpdate, db: Session = Depends(get_db)):
     username = request.session.get('username')
     if username is None:
         raise HTTPException(status_code=401, detail="Not authorized")
@@ -102,7 +102,7 @@ async def update_memo(request: Request, memo_id: int, memo: MemoUpdate, db: Sess
 
 # 메모 삭제
 @router.delete("/memos/{memo_id}")
-async def delete_memo(request: Request, memo_id: int, db: Session = Depends(get_db)):
+def delete_memo(request: Request, memo_id: int, db: Session = Depends(get_db)):
     username = request.session.get('username')
     if username is None:
         raise HTTPException(status_code=401, detail="Not authorized")
@@ -1,10 +1,18 @@
 from fastapi import FastAPI, Request
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi.templating import Jinja2Templates
-from database import engine, Base
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from database import engine, Base, THREADPOOL_SIZE
 from controllers import router
 
-app = FastAPI()
+# controllers 의 DB 작업은 def 엔드포인트라 스레드풀에서 실행된다. 그 스레드 수를 커넥션 풀 크기에 맞춘다.
+@asynccontextmanager
+async def app_lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
+
+app = FastAPI(lifespan=app_lifespan)
 app.add_middleware(SessionMiddleware, secret_key = "ddddd")
 
 # 데이터베이스의 테이블을 만드는 부분 정도는 맨 처음에 객체를 만들자마자 한 번 실행이 돼야하므로 controller에 넣어도 상관없을거 같다.
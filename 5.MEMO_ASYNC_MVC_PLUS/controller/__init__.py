@@ -1 +1 @@
-from .dependencies import get_db, get_password_hash, verify_password
\ No newline at end of file
+from .dependencies import get_db, get_write_db, get_read_db, get_password_hasher, get_current_user_id, get_memo_repository, get_read_memo_repository
\ No newline at end of file
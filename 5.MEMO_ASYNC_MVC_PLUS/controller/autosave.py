@@ -0,0 +1,134 @@
+# 메모 자동 저장 write-behind 큐
+#
+# 편집 중 들어오는 자동 저장 요청은 DB 에 바로 쓰지 않고 (user_id, memo_id) 별로 마지막 값만 모아 두었다가
+# flush_interval 마다, 또는 대기 중인 메모가 max_batch 개를 넘으면 한 트랜잭션으로 한꺼번에 UPDATE 한다.
+#
+# 내구성: 자동 저장 응답(202)은 "큐에 들어갔다"는 뜻이다. 정상 종료(app_lifespan 종료) 때는 남은 내용을
+# 모두 flush 하지만, 프로세스가 강제로 죽으면 마지막 flush 이후 최대 flush_interval 동안의 편집은 사라진다.
+# flush 가 실패하면 실패한 내용을 다시 큐에 넣되, 그 사이 들어온 더 새로운 편집이 우선한다({**failed, **newer}).
+# 직접 수정/삭제로 discard 된 메모는 다시 넣지 않는다.
+# on_flushed(batch, session_factory) 는 쓰기가 커밋된 뒤 batch 전체로 한 번 await 한다.
+
+import asyncio
+import logging
+from sqlalchemy import bindparam, update
+from model.databases.models import Memo, User
+
+logger = logging.getLogger(__name__)
+
+class AutosaveQueue:
+    def __init__(self, session_factory=None, flush_interval: float = 2.0, max_batch: int = 500, on_flushed=None):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_flushed = on_flushed
+        self._pending: dict[tuple, dict] = {}
+        # 지금 DB 에 쓰고 있는 batch 와, 그 도중 discard 된 키
+        self._inflight: dict[tuple, dict] = {}
+        self._discarded: set[tuple] = set()
+        self._lock = asyncio.Lock()
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self.accepted = 0
+        self.flushed = 0
+
+    def submit(self, user_id: int, memo_id: int, changes: dict):
+        if not changes:
+            return
+        self._pending.setdefault((user_id, memo_id), {}).update(changes)
+        self.accepted += 1
+        if len(self._pending) >= self.max_batch and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def discard(self, user_id: int, memo_id: int):
+        # 직접 수정/삭제한 메모에 대해 나중에 예전 자동 저장 내용이 덮어쓰지 않게 한다.
+        # 이미 쓰는 중인 batch 에 들어 있으면 그 쓰기가 끝날 때까지 기다리고, 실패해도 다시 큐에 넣지 않게 한다.
+        key = (user_id, memo_id)
+        self._pending.pop(key, None)
+        if key in self._inflight:
+            self._discarded.add(key)
+            async with self._lock:
+                pass
+
+    def start(self, session_factory=None):
+        if session_factory is not None:
+            self.session_factory = session_factory
+        if self._task is None:
+            # 이벤트와 락은 앱을 실행하는 이벤트 루프에서 만든다.
+            self._wakeup = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # 쓰는 도중 취소하면 batch 가 사라질 수 있으므로 루프에 멈추라고 알리고 끝날 때까지 기다린다.
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("자동 저장 flush 에 실패했습니다.")
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._inflight = batch
+            try:
+                await self._write(batch)
+            except BaseException:
+                for key, changes in batch.items():
+                    if key not in self._discarded:
+                        self._pending[key] = {**changes, **self._pending.get(key, {})}
+                raise
+            finally:
+                self._inflight = {}
+                self._discarded.clear()
+        self.flushed += len(batch)
+        if self.on_flushed is not None:
+            await self.on_flushed(batch, self.session_factory)
+
+    async def _write(self, batch: dict):
+        # 바꿀 컬럼 조합별로 묶어서 executemany 로 실행한다.
+        groups = {}
+        for (user_id, memo_id), changes in batch.items():
+            if "content" in changes:
+                # 검색용 본문 사본도 함께 바꾼다.
+                changes = {**changes, "content_text": changes["content"]}
+            fields = tuple(sorted(changes))
+            params = {"_id": memo_id, "_user_id": user_id}
+            params.update(changes)
+            groups.setdefault(fields, []).append(params)
+
+        table = Memo.__table__
+        async with self.session_factory() as session:
+            for fields, params in groups.items():
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam("_id"), table.c.user_id == bindparam("_user_id"))
+                    .values({field: bindparam(field) for field in fields})
+                )
+                await session.execute(stmt, params)
+            # 목록 ETag 가 바뀌도록 같은 트랜잭션에서 사용자별 메모 버전을 올린다.
+            user_ids = sorted({user_id for user_id, _ in batch})
+            await session.execute(
+                update(User).where(User.id.in_(user_ids)).values(memo_version=User.memo_version + 1)
+            )
+            await session.commit()
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "accepted": self.accepted, "flushed": self.flushed}
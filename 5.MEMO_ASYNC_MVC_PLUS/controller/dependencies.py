@@ -1,15 +1,295 @@
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import Depends, HTTPException, Request
 from passlib.context import CryptContext
-from model.databases.mysql import AsyncSessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.future import select
+from settings import Settings
+from model.databases.models import User
+from model.repositories import MemoRepository, SQLMemoRepository
+from timing import timed_phase
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_crypt_context(settings: Settings) -> CryptContext:
+    """Settings 의 해시 방식과 비용으로 CryptContext 를 만든다.
+    첫 번째 방식이 기본이고 나머지는 deprecated 로 취급되어 로그인할 때 다시 해시된다."""
+    options = {}
+    if "bcrypt" in settings.password_schemes:
+        # min_rounds 보다 낮은 비용으로 저장된 해시는 needs_update 가 된다.
+        options["bcrypt__default_rounds"] = settings.bcrypt_rounds
+        options["bcrypt__min_rounds"] = settings.bcrypt_rounds
+    if "argon2" in settings.password_schemes:
+        options["argon2__time_cost"] = settings.argon2_time_cost
+        options["argon2__memory_cost"] = settings.argon2_memory_cost
+        options["argon2__parallelism"] = settings.argon2_parallelism
+    return CryptContext(schemes=settings.password_schemes, deprecated="auto", **options)
 
-async def get_password_hash(password):
-    return pwd_context.hash(password)
+# 프로세스 풀에서도 pickle 가능하도록 모듈 수준 함수로 두고, CryptContext 대신 설정 문자열(to_string)을 넘긴다.
+# 워커는 같은 설정 문자열이면 만들어 둔 CryptContext 를 다시 쓴다.
+@lru_cache(maxsize=8)
+def _context(config: str) -> CryptContext:
+    return CryptContext.from_string(config)
 
-async def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def _hash(config, password):
+    return _context(config).hash(password)
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
+def _verify(config, plain_password, hashed_password):
+    return _context(config).verify(plain_password, hashed_password)
+
+def _verify_and_update(config, plain_password, hashed_password):
+    return _context(config).verify_and_update(plain_password, hashed_password)
+
+def _dummy_verify(config, dummy_hash, plain_password):
+    # 없는 사용자로 로그인해도 실제 검증과 같은 비용을 써서 응답 시간으로 계정 유무를 알 수 없게 한다.
+    _context(config).verify(plain_password, dummy_hash)
+    return False
+
+# 기본 해시 방식의 비용 파라미터 후보. (파라미터 이름, 최소값, 최대값)
+COST_PARAMETERS = {
+    "bcrypt": ("rounds", 4, 16),
+    "argon2": ("time_cost", 1, 10),
+}
+
+def measure_hash_cost(context: CryptContext, scheme: str, value: int) -> float:
+    name = COST_PARAMETERS[scheme][0]
+    handler = context.handler(scheme).using(**{name: value})
+    start = time.perf_counter()
+    handler.hash("calibration-password")
+    return (time.perf_counter() - start) * 1000
+
+def calibrate_hash_cost(context: CryptContext, budget_ms: float) -> dict:
+    """기본 해시 방식의 비용을 budget_ms 안에 들어가는 가장 큰 값으로 맞춘다."""
+    scheme = context.default_scheme()
+    if scheme not in COST_PARAMETERS:
+        return {"scheme": scheme, "measurements": []}
+    name, lowest, highest = COST_PARAMETERS[scheme]
+    measurements = []
+    chosen = lowest
+    for value in range(lowest, highest + 1):
+        elapsed = measure_hash_cost(context, scheme, value)
+        measurements.append({name: value, "ms": elapsed})
+        if elapsed > budget_ms:
+            break
+        chosen = value
+
+    if scheme == "bcrypt":
+        context.update(bcrypt__default_rounds=chosen, bcrypt__min_rounds=chosen)
+    else:
+        context.update(**{f"{scheme}__{name}": chosen})
+    return {"scheme": scheme, name: chosen, "budget_ms": budget_ms, "measurements": measurements}
+
+class PasswordHasher:
+    """bcrypt 연산을 이벤트 루프 밖의 워커 풀에서 실행하는 해싱 서비스"""
+
+    def __init__(self, context: CryptContext, executor: str = "thread", workers: int = 4, max_concurrency: int = 8):
+        self.context = context
+        self.executor_type = executor
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._config = context.to_string()
+        # 없는 사용자 로그인에 쓸 더미 해시. 첫 "없는 사용자" 로그인만 해시 생성 비용을 더 내지 않도록 시작할 때 만든다.
+        self.dummy_hash: str | None = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.calibration = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hasher")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password):
+        with timed_phase("hash"):
+            return await self._run(_hash, self._config, password)
+
+    async def verify(self, plain_password, hashed_password):
+        with timed_phase("hash"):
+            return await self._run(_verify, self._config, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password, hashed_password):
+        """(일치 여부, 새 해시 또는 None). 해시 설정이 바뀌었으면 새 해시를 함께 돌려준다."""
+        with timed_phase("hash"):
+            return await self._run(_verify_and_update, self._config, plain_password, hashed_password)
+
+    async def dummy_verify(self, plain_password):
+        if self.dummy_hash is None:
+            await self.warm_up()
+        with timed_phase("hash"):
+            return await self._run(_dummy_verify, self._config, self.dummy_hash, plain_password)
+
+    def _refresh(self):
+        # 비용이 바뀌면 워커에 넘기는 설정 문자열과 더미 해시를 새 설정으로 다시 만든다.
+        self._config = self.context.to_string()
+        self.dummy_hash = self.context.hash(secrets.token_urlsafe(16))
+
+    def _calibrate(self, budget_ms: float) -> dict:
+        calibration = calibrate_hash_cost(self.context, budget_ms)
+        self._refresh()
+        return calibration
+
+    async def calibrate(self, budget_ms: float) -> dict:
+        # 측정이 워커 풀의 다른 해싱과 섞이지 않도록 기본 executor 에서 실행한다.
+        loop = asyncio.get_running_loop()
+        self.calibration = await loop.run_in_executor(None, self._calibrate, budget_ms)
+        return self.calibration
+
+    async def warm_up(self):
+        # calibrate 를 하지 않을 때 더미 해시를 만든다.
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._refresh)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "calibration": self.calibration,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        # 세마포어는 만든 이벤트 루프에 묶이므로 앱을 다시 시작하면 새로 만든다.
+        self._semaphore = None
+
+def create_password_hasher(settings: Settings) -> PasswordHasher:
+    return PasswordHasher(
+        build_crypt_context(settings),
+        executor=settings.hash_executor,
+        workers=settings.hash_workers,
+        max_concurrency=settings.hash_max_concurrency,
+    )
+
+def get_password_hasher(request: Request) -> PasswordHasher:
+    return request.app.state.password_hasher
+
+async def get_db(request: Request):
+    async with request.app.state.database.session() as session:
+        yield session
+        await session.commit()
+
+# 쓰기 핸들러용 세션. 세션에 마지막 쓰기 시각을 남겨 이후 읽기가 replica 지연을 보지 않게 한다.
+# 복제 지연이 없는 구성(replica 없음, 같은 파일을 읽는 SQLite 읽기 풀)에서는 남기지 않아 세션이 바뀌지 않게 한다.
+async def get_write_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    database = request.app.state.database
+    if database.settings.replica_urls and not database.sqlite_reader:
+        request.session["last_write"] = time.time()
+    return db
+
+def read_session_factory(request: Request) -> sessionmaker:
+    last_write = request.session.get("last_write")
+    window = request.app.state.settings.replica_read_after_write
+    recently_written = last_write is not None and time.time() - last_write < window
+    return request.app.state.database.read_session_factory(use_primary=recently_written)
+
+# 읽기 전용 핸들러용 세션. replica 가 있으면 돌아가며 고른다.
+async def get_read_db(request: Request):
+    async with read_session_factory(request)() as session:
         yield session
-        await session.commit()
\ No newline at end of file
+
+class UserIdCache:
+    """username -> user id 를 담는 프로세스 로컬 LRU/TTL 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def get(self, username: str) -> int | None:
+        entry = self._data.get(username)
+        if entry is None:
+            return None
+        user_id, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[username]
+            return None
+        self._data.move_to_end(username)
+        return user_id
+
+    def set(self, username: str, user_id: int):
+        self._data[username] = (user_id, time.monotonic() + self.ttl)
+        self._data.move_to_end(username)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, username: str):
+        self._data.pop(username, None)
+
+    def clear(self):
+        self._data.clear()
+
+# 로그인한 사용자의 id를 세션 -> 캐시 -> DB 순으로 찾는다.
+async def get_current_user_id(request: Request, db: AsyncSession = Depends(get_db)) -> int:
+    username = request.session.get("username")
+    if username is None:
+        raise HTTPException(status_code=401, detail="인증되지 않은 사용자입니다.")
+    user_id = request.session.get("user_id")
+    if user_id is not None:
+        return user_id
+    user_id_cache = request.app.state.user_id_cache
+    user_id = user_id_cache.get(username)
+    if user_id is None:
+        result = await db.execute(select(User.id).where(User.username == username))
+        user_id = result.scalars().first()
+        if user_id is None:
+            raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다.")
+        user_id_cache.set(username, user_id)
+    request.session["user_id"] = user_id
+    return user_id
+
+# 운영 정보(/internal/*, /metrics)는 토큰을 아는 모니터링에만 보여 준다. 토큰이 없으면 없는 경로처럼 404 를 돌려준다.
+def require_internal_token(request: Request):
+    token = request.app.state.settings.internal_endpoints_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("authorization", "").encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="인증되지 않은 요청입니다.", headers={"WWW-Authenticate": "Bearer"})
+
+# 내보내기와 검색은 SQL 로만 구현되어 있어 mongo 백엔드에서는 막는다.
+def require_sql_backend(request: Request):
+    if request.app.state.settings.memo_backend != "sql":
+        raise HTTPException(status_code=501, detail="이 저장소에서는 지원하지 않는 기능입니다.")
+
+# Settings.memo_backend 에 따라 메모 저장소를 고른다. motor 는 mongo 백엔드에서만 import 한다.
+def _memo_repository(request: Request, db: AsyncSession) -> MemoRepository:
+    if request.app.state.settings.memo_backend == "mongo":
+        from model.repositories.mongo import MongoMemoRepository
+        return MongoMemoRepository(request.app.state.mongo_database)
+    return SQLMemoRepository(db)
+
+async def get_memo_repository(request: Request, db: AsyncSession = Depends(get_write_db)) -> MemoRepository:
+    return _memo_repository(request, db)
+
+async def get_read_memo_repository(request: Request, db: AsyncSession = Depends(get_read_db)) -> MemoRepository:
+    return _memo_repository(request, db)
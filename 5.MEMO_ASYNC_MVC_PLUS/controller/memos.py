@@ -1,87 +1,239 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.templating import Jinja2Templates
+import csv
+import io
+import json
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from .dependencies import get_db
-from model.databases.models import User, Memo
-from model.appmodel.schemas import MemoCreate, MemoUpdate
+from .dependencies import get_read_db, get_current_user_id, get_memo_repository, get_read_memo_repository, read_session_factory, require_sql_backend
+from model.databases.models import Memo
+from typing import List
+from model.appmodel.schemas import MemoCreate, MemoUpdate, MemoBulkUpdate, MemoBulkDelete
+from settings import Settings
+from model.repositories import MemoRepository
+from model.search import SearchIndex
+from .page_cache import RenderedPageCache, etag_matches, memo_etag
+from templating import render_template
+from .autosave import AutosaveQueue
 
 memos = APIRouter()
-templates = Jinja2Templates(directory="templates")
+
+def create_autosave_queue(settings: Settings, search_index: SearchIndex) -> AutosaveQueue:
+    async def flushed(batch: dict, session_factory):
+        # 색인이 올라와 있는 사용자만 고친다. 나머지는 다음 검색 때 DB 에서 새로 만든다.
+        # 제목과 본문이 모두 바뀌었고 색인에 있는 메모는 바뀐 값으로 바로 고치고,
+        # 한쪽만 바뀌었거나 색인에 없는 메모(다른 워커가 만든 메모, 남의 메모 id)는 DB 에서 다시 읽는다.
+        reread = set()
+        for (user_id, memo_id), changes in batch.items():
+            if not search_index.loaded(user_id):
+                continue
+            if "title" in changes and "content" in changes and search_index.contains(user_id, memo_id):
+                search_index.add(user_id, memo_id, changes["title"], changes["content"])
+            else:
+                reread.add((user_id, memo_id))
+        if not reread:
+            return
+        try:
+            async with session_factory() as db:
+                result = await db.execute(
+                    select(Memo.user_id, Memo.id, Memo.title, Memo.content_text).where(Memo.id.in_({memo_id for _, memo_id in reread}))
+                )
+                for user_id, memo_id, title, content_text in result.all():
+                    if (user_id, memo_id) in reread:
+                        search_index.add(user_id, memo_id, title, content_text)
+        except Exception:
+            for user_id, _ in reread:
+                search_index.invalidate(user_id)
+            raise
+
+    # 세션 팩토리는 app_lifespan 에서 start() 할 때 앱의 Database 것으로 정해진다.
+    return AutosaveQueue(
+        flush_interval=settings.autosave_flush_interval,
+        max_batch=settings.autosave_max_batch,
+        on_flushed=flushed,
+    )
 
 # 메모 생성
 @memos.post("/")
-async def create_memo(request: Request, memo: MemoCreate, db: AsyncSession = Depends(get_db)):
-    username = request.session.get("username")
-    if username is None:
-        raise HTTPException(status_code=401, detail="인증되지 않은 사용자입니다.")
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalars().first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다.")
-    
-    new_memo = Memo(user_id=user.id, title=memo.title, content=memo.content)
-    db.add(new_memo)
-    await db.commit()
-    await db.refresh(new_memo)
+async def create_memo(request: Request, memo: MemoCreate, repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    new_memo = await repo.create(user_id, memo.title, memo.content)
+    request.app.state.search_index.add(user_id, new_memo["id"], new_memo["title"], new_memo["content"])
     return new_memo
 
 # 메모 조회
 @memos.get("/")
-async def list_memos(request: Request, db: AsyncSession = Depends(get_db)):
-    username = request.session.get("username")
-    if username is None:
-        raise HTTPException(status_code=401, detail="인증되지 않은 사용자입니다.")
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalars().first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다.")
-    
-    result = await db.execute(select(Memo).where(Memo.user_id == user.id))
-    memos = result.scalars().all()
-    return templates.TemplateResponse("memos.html", {"request": request, "memos": memos, "username": username})
+async def list_memos(request: Request, repo: MemoRepository = Depends(get_read_memo_repository), user_id: int = Depends(get_current_user_id)):
+    # 버전은 메모와 같은 트랜잭션에서 DB 에 올라가므로 다른 워커가 바꾼 것도 반영된다.
+    # 목록보다 먼저 읽어, 캐시에 든 페이지가 그 버전보다 오래된 일은 없게 한다.
+    version = await repo.version(user_id)
+    fingerprint = request.app.state.template_fingerprint
+    etag = memo_etag(user_id, version, fingerprint)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = (user_id, version, fingerprint)
+    page_cache = request.app.state.page_cache
+    if page_cache is not None:
+        body = page_cache.get(cache_key)
+        if body is not None:
+            return HTMLResponse(body, headers=headers)
+
+    # 첫 페이지만 렌더링하고 나머지는 /memos/api 로 지연 로딩한다. 본문은 화면에 보일 때 따로 불러온다.
+    memos, next_cursor = await repo.list_page(user_id, None, request.app.state.settings.memo_page_size, include_content=False)
+    response = await render_template(request, "memos.html", {"memos": memos, "next_cursor": next_cursor, "username": request.session.get("username")}, headers=headers)
+    if page_cache is not None:
+        page_cache.set(cache_key, response.body)
+    return response
+
+# 메모 목록 API (JSON)
+@memos.get("/api")
+async def list_memos_api(
+    request: Request,
+    cursor: int | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    include_content: bool = False,
+    repo: MemoRepository = Depends(get_read_memo_repository),
+    user_id: int = Depends(get_current_user_id),
+):
+    settings = request.app.state.settings
+    limit = min(limit or settings.memo_page_size, settings.memo_page_size_max)
+    items, next_cursor = await repo.list_page(user_id, cursor, limit, include_content)
+    return {"items": items, "next_cursor": next_cursor}
+
+# 메모 검색 (SQL 저장소 전용)
+@memos.get("/search", dependencies=[Depends(require_sql_backend)])
+async def search_memos(
+    request: Request,
+    q: str = Query(min_length=1),
+    offset: int = Query(default=0, ge=0),
+    limit: int | None = Query(default=None, ge=1),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    settings = request.app.state.settings
+    limit = min(limit or settings.memo_page_size, settings.memo_page_size_max)
+    items = await request.app.state.search_index.search(db, user_id, q, offset, limit)
+    return {"items": items, "offset": offset, "limit": limit}
+
+# 서버 사이드 커서로 메모를 chunk 단위로 읽어 직렬화한다.
+# 응답 스트리밍 중에는 요청 세션이 이미 닫혀 있으므로 별도 세션을 연다.
+def memo_export_query(user_id: int, chunk_size: int):
+    return (
+        select(Memo.id, Memo.title, Memo.content)
+        .where(Memo.user_id == user_id)
+        .order_by(Memo.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+async def stream_memo_rows(session_factory, user_id: int, format: str, chunk_size: int):
+    query = memo_export_query(user_id, chunk_size)
+    async with session_factory() as session:
+        result = await session.stream(query)
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["id", "title", "content"])
+            async for rows in result.partitions(chunk_size):
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for rows in result.mappings().partitions(chunk_size):
+                yield "".join(json.dumps(dict(row), ensure_ascii=False) + "\n" for row in rows)
+
+# 메모 내보내기 (NDJSON/CSV, SQL 저장소 전용)
+@memos.get("/export", dependencies=[Depends(require_sql_backend)])
+async def export_memos(request: Request, format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"), user_id: int = Depends(get_current_user_id)):
+    if format == "csv":
+        media_type = "text/csv; charset=utf-8"
+    else:
+        media_type = "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="memos.{format}"'}
+    rows = stream_memo_rows(read_session_factory(request), user_id, format, request.app.state.settings.memo_export_chunk_size)
+    return StreamingResponse(rows, media_type=media_type, headers=headers)
+
+def check_bulk_size(request: Request, items: list):
+    bulk_max = request.app.state.settings.memo_bulk_max
+    if len(items) > bulk_max:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {bulk_max}개까지 처리할 수 있습니다.")
+
+# 메모 일괄 생성
+@memos.post("/bulk")
+async def bulk_create_memos(request: Request, items: List[MemoCreate], repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    check_bulk_size(request, items)
+    if not items:
+        return {"results": []}
+    ids = await repo.bulk_create(user_id, [(item.title, item.content) for item in items])
+    search_index = request.app.state.search_index
+    for memo_id, item in zip(ids, items):
+        search_index.add(user_id, memo_id, item.title, item.content)
+    return {"results": [{"index": i, "id": memo_id, "status": "created"} for i, memo_id in enumerate(ids)]}
+
+# 메모 일괄 업데이트
+@memos.put("/bulk")
+async def bulk_update_memos(request: Request, items: List[MemoBulkUpdate], repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    check_bulk_size(request, items)
+    owned = await repo.bulk_update(user_id, [(item.id, item.title, item.content) for item in items])
+    results = [
+        {"index": i, "id": item.id, "status": "updated" if item.id in owned else "not_found"}
+        for i, item in enumerate(items)
+    ]
+    if owned:
+        request.app.state.search_index.invalidate(user_id)
+    return {"results": results}
+
+# 메모 일괄 삭제
+@memos.delete("/bulk")
+async def bulk_delete_memos(request: Request, data: MemoBulkDelete, repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    check_bulk_size(request, data.ids)
+    owned = await repo.bulk_delete(user_id, data.ids)
+    search_index = request.app.state.search_index
+    for memo_id in owned:
+        search_index.remove(user_id, memo_id)
+    results = [
+        {"index": i, "id": memo_id, "status": "deleted" if memo_id in owned else "not_found"}
+        for i, memo_id in enumerate(data.ids)
+    ]
+    return {"results": results}
+
+# 메모 본문 (압축을 풀면서 스트리밍)
+@memos.get("/{memo_id}/content")
+async def get_memo_content(memo_id: int, repo: MemoRepository = Depends(get_read_memo_repository), user_id: int = Depends(get_current_user_id)):
+    chunks = await repo.content_chunks(user_id, memo_id)
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다.")
+    return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+
+# 메모 자동 저장 (write-behind)
+@memos.put("/{memo_id}/autosave", status_code=202)
+async def autosave_memo(request: Request, memo_id: int, memo: MemoUpdate, repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    # write-behind 큐는 SQL 저장소 전용이다. mongo 백엔드는 바로 저장한다.
+    if request.app.state.settings.memo_backend == "mongo":
+        await repo.update(user_id, memo_id, memo.title, memo.content)
+        return {"message": "자동 저장되었습니다."}
+    changes = {field: value for field, value in (("title", memo.title), ("content", memo.content)) if value is not None}
+    request.app.state.autosave_queue.submit(user_id, memo_id, changes)
+    return {"message": "자동 저장 대기 중입니다."}
 
 # 메모 업데이트
 @memos.put("/{memo_id}")
-async def update_memo(request: Request, memo_id: int, memo: MemoUpdate, db: AsyncSession = Depends(get_db)):
-    username = request.session.get("username")
-    if username is None:
-        raise HTTPException(status_code=401, detail="인증되지 않은 사용자입니다.")
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalars().first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다.")
-    
-    result = await db.execute(select(Memo).where(Memo.user_id == user.id, Memo.id == memo_id))
-    db_memo = result.scalars().first()
+async def update_memo(request: Request, memo_id: int, memo: MemoUpdate, repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    await request.app.state.autosave_queue.discard(user_id, memo_id)
+    db_memo = await repo.update(user_id, memo_id, memo.title, memo.content)
     if db_memo is None:
-        return {"error": "메모를 찾을 수 없습니다."}
-    
-    if memo.title is not None:
-        db_memo.title = memo.title
-    if memo.content is not None:
-        db_memo.content = memo.content
-    
-    await db.commit()
-    await db.refresh(db_memo)
+        raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다.")
+    request.app.state.search_index.add(user_id, db_memo["id"], db_memo["title"], db_memo["content"])
     return db_memo
 
 # 메모 삭제
 @memos.delete("/{memo_id}")
-async def delete_memo(request: Request, memo_id: int, db: AsyncSession = Depends(get_db)):
-    username = request.session.get("username")
-    if username is None:
-        raise HTTPException(status_code=401, detail="인증되지 않은 사용자입니다.")
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalars().first()
-    if user is None:
-        raise HTTPException(status_code=404, detail="유저를 찾을 수 없습니다.")
-    
-    result = await db.execute(select(Memo).where(Memo.id == memo_id, Memo.user_id == user.id))
-    db_memo = result.scalars().first()
-    if db_memo is None:
-        return {"error": "메모를 찾을 수 없습니다."}
-    
-    await db.delete(db_memo)
-    await db.commit()
-    return {"message": "메모가 삭제되었습니다."}
\ No newline at end of file
+async def delete_memo(request: Request, memo_id: int, repo: MemoRepository = Depends(get_memo_repository), user_id: int = Depends(get_current_user_id)):
+    await request.app.state.autosave_queue.discard(user_id, memo_id)
+    if not await repo.delete(user_id, memo_id):
+        raise HTTPException(status_code=404, detail="메모를 찾을 수 없습니다.")
+    request.app.state.search_index.remove(user_id, memo_id)
+    return {"message": "메모가 삭제되었습니다."}
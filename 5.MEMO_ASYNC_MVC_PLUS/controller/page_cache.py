@@ -0,0 +1,42 @@
+# /memos/ 목록 페이지의 ETag 와 렌더링 결과 캐시
+
+from collections import OrderedDict
+
+def memo_etag(user_id: int, version: int, fingerprint: str) -> str:
+    """users.memo_version 과 템플릿 fingerprint 로 만든 ETag. 워커와 재시작에 관계없이 같은 상태, 같은 템플릿이면 같은 값이다."""
+    return f'"{user_id}-{version}-{fingerprint}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+class RenderedPageCache:
+    """(user_id, version, 템플릿 fingerprint) -> 렌더링된 HTML. 전체 크기가 max_bytes 를 넘으면 오래된 것부터 버린다."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def get(self, key: tuple) -> bytes | None:
+        body = self._data.get(key)
+        if body is not None:
+            self._data.move_to_end(key)
+        return body
+
+    def set(self, key: tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._data[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
@@ -0,0 +1,114 @@
+# 로그인 시도 횟수 제한 (token bucket)
+# DB 조회와 bcrypt 검증 전에 확인해서, 한 계정/IP 에 대한 무차별 대입이 CPU 를 쓰지 못하게 한다.
+
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from fastapi import HTTPException
+
+class MemoryRateLimitStore:
+    """프로세스 로컬 token bucket 저장소. 키를 여러 샤드로 나눠 샤드마다 락을 건다.
+    샤드는 마지막으로 쓴 순서의 LRU 이고 max_keys_per_shard 개를 넘지 않는다."""
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards = [(OrderedDict(), threading.Lock()) for _ in range(shards)]
+
+    def _shard(self, key: str):
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    async def hit(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """토큰 하나를 쓴다. 허용되면 0, 아니면 다시 시도할 수 있을 때까지의 초를 돌려준다."""
+        buckets, lock = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            tokens, updated = buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            if tokens >= 1:
+                buckets[key] = (tokens - 1, now)
+                retry_after = 0.0
+            else:
+                buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / refill_per_second
+            buckets.move_to_end(key)
+            if len(buckets) > self.max_keys_per_shard:
+                self._prune(buckets, now, capacity, refill_per_second, self.max_keys_per_shard)
+        return retry_after
+
+    @staticmethod
+    def _prune(buckets: OrderedDict, now: float, capacity: int, refill_per_second: float, max_keys: int):
+        # 오래 쓰지 않은 쪽부터 본다. 이미 가득 찬 버킷은 없는 것과 같으므로 지우고,
+        # 그래도 넘치면 가장 오래 쓰지 않은 버킷을 버린다. 지우는 버킷 수만큼만 일하므로 샤드 전체를 훑지 않는다.
+        while buckets:
+            tokens, updated = next(iter(buckets.values()))
+            if tokens + (now - updated) * refill_per_second < capacity:
+                break
+            buckets.popitem(last=False)
+        while len(buckets) > max_keys:
+            buckets.popitem(last=False)
+
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+class RedisRateLimitStore:
+    """여러 워커가 공유하는 Redis token bucket 저장소"""
+
+    def __init__(self, redis, prefix: str = "ratelimit:"):
+        self.prefix = prefix
+        self._script = redis.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key, capacity, refill_per_second):
+        retry_after = await self._script(keys=[self.prefix + key], args=[capacity, refill_per_second, time.time()])
+        return float(retry_after)
+
+class LoginRateLimiter:
+    def __init__(self, store, user_attempts: int, user_window: float, ip_attempts: int, ip_window: float):
+        self.store = store
+        self.user_limit = (user_attempts, user_attempts / user_window)
+        self.ip_limit = (ip_attempts, ip_attempts / ip_window)
+        self.rejected = 0
+
+    async def check(self, username: str, client_ip: str):
+        # IP 에서 먼저 막히면 계정 버킷은 건드리지 않는다.
+        retry_after = await self.store.hit("ip:" + client_ip, *self.ip_limit)
+        if not retry_after:
+            retry_after = await self.store.hit("user:" + username, *self.user_limit)
+        if retry_after:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="로그인 시도가 너무 많습니다. 잠시 후 다시 시도하세요.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+def create_login_rate_limiter(settings) -> LoginRateLimiter:
+    if settings.login_rate_limit_backend == "redis":
+        from redis.asyncio import Redis
+        store = RedisRateLimitStore(Redis.from_url(settings.redis_url))
+    else:
+        store = MemoryRateLimitStore()
+    return LoginRateLimiter(
+        store,
+        user_attempts=settings.login_user_attempts,
+        user_window=settings.login_user_window,
+        ip_attempts=settings.login_ip_attempts,
+        ip_window=settings.login_ip_window,
+    )
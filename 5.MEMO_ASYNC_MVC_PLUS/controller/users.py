@@ -1,23 +1,22 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from .dependencies import get_db, get_password_hash, verify_password
+from .dependencies import PasswordHasher, get_db, get_password_hasher
 from model.databases.models import User
 from model.appmodel.schemas import UserCreate, UserLogin
+from session import rotate_session
 
 users = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 # 회원가입
 @users.post("/signup/")
-async def signup(signup_data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def signup(request: Request, signup_data: UserCreate, db: AsyncSession = Depends(get_db), password_hasher: PasswordHasher = Depends(get_password_hasher)):
     result = await db.execute(select(User).where(User.username == signup_data.username))
     existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(status_code=400, detail="이미 동일 사용자 이름이 가입되어 있습니다.")
     
-    hashed_password = get_password_hash(signup_data.password)
+    hashed_password = await password_hasher.hash(signup_data.password)
     new_user = User(
         username = signup_data.username,
         email = signup_data.email,
@@ -32,23 +31,46 @@ async def signup(signup_data: UserCreate, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail="회원가입이 실패했습니다. 기입한 내용을 확인해보세요.")
     
     await db.refresh(new_user)
+    request.app.state.user_id_cache.invalidate(new_user.username)
     return {"message": "회원가입이 성공했습니다."}
 
 # 로그인
 @users.post("/login/")
-async def login(request: Request, signin_data: UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(request: Request, signin_data: UserLogin, db: AsyncSession = Depends(get_db), password_hasher: PasswordHasher = Depends(get_password_hasher)):
+    client_ip = request.client.host if request.client else "unknown"
+    await request.app.state.login_rate_limiter.check(signin_data.username, client_ip)
     result = await db.execute(select(User).where(User.username == signin_data.username))
     user = result.scalars().first()
-    if user and verify_password(user.hashed_password, signin_data.password):
-        request.session["username"] = user.username
-        return {"message": "로그인이 성공했습니다."}
-    else:
+    if user is None:
+        await password_hasher.dummy_verify(signin_data.password)
         raise HTTPException(status_code=401, detail="로그인이 실패했습니다.")
 
+    verified, new_hash = await password_hasher.verify_and_update(signin_data.password, user.hashed_password)
+    if not verified:
+        raise HTTPException(status_code=401, detail="로그인이 실패했습니다.")
+    if new_hash is not None:
+        # 해시 방식이나 비용이 바뀌었으면 새 설정으로 다시 저장한다. (get_db 가 commit)
+        user.hashed_password = new_hash
+
+    # 로그인 전에 받은 세션 id 를 계속 쓰지 않도록 새 id 를 발급받는다.
+    rotate_session(request)
+    request.session["username"] = user.username
+    request.session["user_id"] = user.id
+    request.app.state.user_id_cache.set(user.username, user.id)
+    return {"message": "로그인이 성공했습니다."}
+
 # 로그아웃
 @users.post("/logout/")
 async def logout(request: Request):
-    request.session.pop("username", None)
+    rotate_session(request)
+    username = request.session.pop("username", None)
+    request.session.pop("user_id", None)
+    if username is not None:
+        request.app.state.user_id_cache.invalidate(username)
+        # 서버 사이드 세션이면 이 사용자의 모든 세션을 폐기한다.
+        session_store = request.app.state.session_store
+        if session_store is not None:
+            await session_store.revoke_user(username)
     return {"message": "로그아웃이 성공했습니다."}
 
 # 소개
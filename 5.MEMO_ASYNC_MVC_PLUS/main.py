@@ -1,12 +1,22 @@
-from fastapi import FastAPI, Request, Depends
+import asyncio
+from fastapi import APIRouter, FastAPI, Request, Depends
+from sqlalchemy import text
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
-from fastapi.templating import Jinja2Templates
-from model.databases.mysql import engine, Base
+from model.databases.mysql import Base, Database
+from model.databases import migrations
 from controller.users import users
-from controller.memos import memos
+from controller.memos import memos, create_autosave_queue
+from controller.dependencies import UserIdCache, create_password_hasher, require_internal_token
+from controller.page_cache import RenderedPageCache
+from controller.ratelimit import create_login_rate_limiter
 from contextlib import asynccontextmanager
-from settings import Settings
+from settings import Settings, get_settings
 from module import app_settings
+from model.search import create_search_index
+from session import ServerSessionMiddleware, create_session_store
+from timing import RequestMetrics, TimingMiddleware, instrument_engine
+from templating import create_template_environment, preload_templates, render_template, template_fingerprint
 
 '''
 *** 4.MEMO_ASYNC_MVC에서 수정할 부분 ***
@@ -14,32 +24,109 @@ from module import app_settings
 '''
 
 
+# 첫 요청들이 커넥션을 여는 비용을 기다리지 않도록 미리 열어 풀에 넣어 둔다.
+async def warm_pool(warmed, count: int):
+    async def touch():
+        async with warmed.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await asyncio.gather(*(touch() for _ in range(count)))
+
 @asynccontextmanager
 async def app_lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    settings = app.state.settings
+    database = app.state.database
+    for instrumented in database.engines():
+        instrument_engine(instrumented)
+    async with database.engine.begin() as conn:
+        if settings.db_schema_startup == "migrate":
+            await conn.run_sync(migrations.upgrade)
+        elif settings.db_schema_startup == "create_all":
+            await conn.run_sync(Base.metadata.create_all)
+        else:
+            await conn.run_sync(migrations.check)
+    if settings.memo_backend == "mongo":
+        from model.repositories.mongo import MongoMemoRepository
+        await MongoMemoRepository(app.state.mongo_database).ensure_indexes()
+    if settings.template_preload:
+        preload_templates(app.state.templates)
+    # 없는 사용자 로그인에 쓸 더미 해시를 만든다. calibrate 는 바뀐 비용으로 다시 만든다.
+    password_hasher = app.state.password_hasher
+    autosave_queue = app.state.autosave_queue
+    if settings.password_hash_budget_ms > 0:
+        await password_hasher.calibrate(settings.password_hash_budget_ms)
+    else:
+        await password_hasher.warm_up()
+    if settings.db_pool_warm > 0:
+        await warm_pool(database.engine, settings.db_pool_warm)
+    autosave_queue.start(database.session_factory)
     yield
+    # 남은 자동 저장 내용을 DB 에 쓰고 종료한다.
+    await autosave_queue.stop()
+    password_hasher.shutdown()
+    await database.dispose()
 
 def create_app(settings: Settings) -> FastAPI:
     app = FastAPI(
         lifespan=app_lifespan,
     )
- 
-    app.add_middleware(SessionMiddleware, secret_key=settings.secret_key)
+    app.settings = settings
+    app.state.settings = settings
+    # 설정으로 만드는 서비스는 모두 앱마다 따로 둔다. 핸들러는 request.app.state 에서 꺼내 쓴다.
+    app.state.database = Database(settings)
+    app.state.session_store = create_session_store(settings)
+    app.state.login_rate_limiter = create_login_rate_limiter(settings)
+    app.state.password_hasher = create_password_hasher(settings)
+    app.state.user_id_cache = UserIdCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+    app.state.search_index = create_search_index(settings.search_backend, settings.search_index_max_docs, settings.search_index_ttl)
+    app.state.page_cache = RenderedPageCache(settings.memo_page_cache_bytes) if settings.memo_page_cache_bytes > 0 else None
+    app.state.autosave_queue = create_autosave_queue(settings, app.state.search_index)
+    app.state.templates = create_template_environment(settings)
+    app.state.template_fingerprint = template_fingerprint(app.state.templates)
+    app.state.metrics = RequestMetrics()
+    if settings.memo_backend == "mongo":
+        from model.databases.mongodb import create_mongo_database
+        app.state.mongo_database = create_mongo_database(settings)
+
+    if app.state.session_store is not None:
+        app.add_middleware(ServerSessionMiddleware, store=app.state.session_store, max_age=settings.session_ttl)
+    else:
+        app.add_middleware(SessionMiddleware, secret_key=settings.secret_key)
+    app.add_middleware(TimingMiddleware, metrics=app.state.metrics)
     app.include_router(users)
     app.include_router(memos, prefix="/memos")
+    app.include_router(root)
+    app.include_router(internal)
     return app
 
-templates = Jinja2Templates(directory="templates")
-
-application: FastAPI = create_app(Settings())
+root = APIRouter()
 
-@application.get("/")
+@root.get("/")
 async def read_root(request: Request):
-    return templates.TemplateResponse("home.html", {"request": request})
+    return await render_template(request, "home.html", {"request": request})
 
-@application.get("/test")
+@root.get("/test")
 async def read_root(
     settings: Settings = Depends(app_settings)
 ):
-    return {"test": settings.test_env}
\ No newline at end of file
+    return {"test": settings.test_env}
+
+# 운영 정보. INTERNAL_ENDPOINTS_TOKEN 을 설정해야 열린다.
+internal = APIRouter(dependencies=[Depends(require_internal_token)])
+
+@internal.get("/internal/hashing")
+async def hashing_stats(request: Request):
+    return request.app.state.password_hasher.stats()
+
+@internal.get("/internal/pool")
+async def pool_status(request: Request):
+    return request.app.state.database.pool_snapshot()
+
+@internal.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    return request.app.state.metrics.render()
+
+@internal.get("/internal/autosave")
+async def autosave_stats(request: Request):
+    return request.app.state.autosave_queue.stats()
+
+application: FastAPI = create_app(get_settings())
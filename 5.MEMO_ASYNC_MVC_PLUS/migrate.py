@@ -0,0 +1,33 @@
+# 스키마 마이그레이션 CLI
+#
+# python migrate.py upgrade [버전]   최신(또는 지정한 버전)까지 적용
+# python migrate.py current          현재 버전 확인
+
+import argparse
+import asyncio
+from model.databases.mysql import get_database
+from model.databases import migrations
+
+async def main():
+    parser = argparse.ArgumentParser(description="메모 앱 DB 스키마 마이그레이션")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subparsers.add_parser("upgrade")
+    upgrade_parser.add_argument("target", nargs="?", type=int, default=migrations.HEAD)
+    subparsers.add_parser("current")
+    args = parser.parse_args()
+
+    database = get_database()
+    async with database.engine.begin() as conn:
+        if args.command == "upgrade":
+            applied = await conn.run_sync(migrations.upgrade, args.target)
+            for number, description in applied:
+                print(f"{number:04d} 적용: {description}")
+            if not applied:
+                print("적용할 마이그레이션이 없습니다.")
+        else:
+            version = await conn.run_sync(migrations.current_version)
+            print(f"현재 버전: {version} (최신: {migrations.HEAD})")
+    await database.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
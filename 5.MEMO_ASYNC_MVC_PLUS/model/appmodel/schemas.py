@@ -1,7 +1,7 @@
 # Pydantic의 BaseModel 관련 코드
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 # 회원가입시 데이터 검증
 class UserCreate(BaseModel):
@@ -19,4 +19,10 @@ class MemoCreate(BaseModel):
 
 class MemoUpdate(BaseModel):
     title: Optional[str] = None
-    content: Optional[str] = None
\ No newline at end of file
+    content: Optional[str] = None
+
+class MemoBulkUpdate(MemoUpdate):
+    id: int
+
+class MemoBulkDelete(BaseModel):
+    ids: List[int]
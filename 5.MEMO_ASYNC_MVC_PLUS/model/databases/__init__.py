@@ -1,2 +1,2 @@
-from .mysql import AsyncSessionLocal, engine, Base
-from .models import User, Memo
\ No newline at end of file
+from .mysql import Database, get_database, Base
+from .models import User, Memo
@@ -0,0 +1,119 @@
+# 버전별 스키마 마이그레이션
+# 각 마이그레이션은 당시의 테이블 정의를 직접 들고 있어서 이후 models.py 가 바뀌어도 결과가 달라지지 않는다.
+# 적용된 버전은 schema_version 테이블에 기록한다.
+
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table, bindparam, inspect, select, text, update
+from model.databases.types import CompressedText, SearchText
+
+version_table = Table("schema_version", MetaData(), Column("version", Integer, nullable=False))
+
+def _0001_create_tables(conn):
+    metadata = MetaData()
+    Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("username", String(100), unique=True, index=True),
+        Column("email", String(200)),
+        Column("hashed_password", String(512)),
+    )
+    Table(
+        "memo", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id")),
+        Column("title", String(100)),
+        Column("content", String(1000)),
+    )
+    # create_all 로 이미 만들어진 DB 도 그대로 이어받을 수 있게 checkfirst 한다.
+    metadata.create_all(conn, checkfirst=True)
+
+def _0002_memo_indexes(conn):
+    memo = Table("memo", MetaData(), autoload_with=conn)
+    Index("ix_memo_user_id_id", memo.c.user_id, memo.c.id).create(conn, checkfirst=True)
+    if conn.dialect.name == "mysql":
+        Index("ft_memo_title_content", memo.c.title, memo.c.content, mysql_prefix="FULLTEXT", mysql_with_parser="ngram").create(conn, checkfirst=True)
+
+def _0003_memo_covering_index(conn):
+    memo = Table("memo", MetaData(), autoload_with=conn)
+    # 새 인덱스가 user_id 외래키 인덱스 역할을 이어받은 뒤에 예전 인덱스를 지운다.
+    Index("ix_memo_user_id_id_title", memo.c.user_id, memo.c.id, memo.c.title).create(conn, checkfirst=True)
+    Index("ix_memo_user_id_id", memo.c.user_id, memo.c.id).drop(conn, checkfirst=True)
+
+def _0004_memo_content_blob(conn):
+    # 압축 본문을 담도록 content 를 LONGBLOB 으로 바꾼다. 기존 VARCHAR 값은 바이트 그대로 남고
+    # 압축 표시가 없으므로 평문으로 읽힌다. SQLite 는 컬럼 타입을 강제하지 않아 바꿀 필요가 없다.
+    if conn.dialect.name != "mysql":
+        return
+    memo = Table("memo", MetaData(), autoload_with=conn)
+    Index("ft_memo_title_content", memo.c.title, memo.c.content).drop(conn, checkfirst=True)
+    conn.execute(text("ALTER TABLE memo MODIFY content LONGBLOB"))
+    Index("ft_memo_title", memo.c.title, mysql_prefix="FULLTEXT", mysql_with_parser="ngram").create(conn, checkfirst=True)
+
+def _0005_user_memo_version(conn):
+    # 워커끼리 공유하는 메모 버전. 예전에는 프로세스마다 따로 세었다.
+    columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "memo_version" not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN memo_version INTEGER NOT NULL DEFAULT 0"))
+
+def _0006_memo_content_text(conn):
+    # fulltext 백엔드가 본문도 검색하도록 압축하지 않은 본문 앞부분을 따로 두고 FULLTEXT 인덱스를 다시 만든다.
+    columns = {column["name"] for column in inspect(conn).get_columns("memo")}
+    if "content_text" not in columns:
+        column_type = "MEDIUMTEXT" if conn.dialect.name == "mysql" else "TEXT"
+        conn.execute(text(f"ALTER TABLE memo ADD COLUMN content_text {column_type}"))
+    memo = Table(
+        "memo", MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("title", String(100)),
+        Column("content", CompressedText()),
+        Column("content_text", SearchText()),
+    )
+    # 압축은 DB 가 풀 수 없으므로 읽어서 채운다. 큰 테이블도 메모리를 많이 쓰지 않게 id 순으로 나눠 처리한다.
+    last_id = 0
+    while True:
+        rows = conn.execute(select(memo.c.id, memo.c.content).where(memo.c.id > last_id).order_by(memo.c.id).limit(1000)).all()
+        if not rows:
+            break
+        conn.execute(
+            update(memo).where(memo.c.id == bindparam("_id")).values(content_text=bindparam("content_text")),
+            [{"_id": memo_id, "content_text": content} for memo_id, content in rows],
+        )
+        last_id = rows[-1][0]
+    if conn.dialect.name == "mysql":
+        Index("ft_memo_title", memo.c.title).drop(conn, checkfirst=True)
+        Index("ft_memo_title_content_text", memo.c.title, memo.c.content_text, mysql_prefix="FULLTEXT", mysql_with_parser="ngram").create(conn, checkfirst=True)
+
+MIGRATIONS = [
+    (1, "users, memo 테이블 생성", _0001_create_tables),
+    (2, "memo (user_id, id) 복합 인덱스와 FULLTEXT 인덱스", _0002_memo_indexes),
+    (3, "memo (user_id, id, title) 커버링 인덱스로 교체", _0003_memo_covering_index),
+    (4, "memo.content 를 압축 BLOB 으로 변경", _0004_memo_content_blob),
+    (5, "users.memo_version 추가", _0005_user_memo_version),
+    (6, "memo.content_text (검색용 본문) 추가와 FULLTEXT 인덱스 교체", _0006_memo_content_text),
+]
+
+HEAD = MIGRATIONS[-1][0]
+
+def current_version(conn) -> int:
+    if not inspect(conn).has_table(version_table.name):
+        return 0
+    version = conn.execute(select(version_table.c.version)).scalar()
+    return version or 0
+
+def upgrade(conn, target: int = HEAD) -> list:
+    version_table.create(conn, checkfirst=True)
+    version = current_version(conn)
+    applied = []
+    for number, description, migrate in MIGRATIONS:
+        if version < number <= target:
+            migrate(conn)
+            conn.execute(version_table.delete())
+            conn.execute(version_table.insert().values(version=number))
+            applied.append((number, description))
+    return applied
+
+def check(conn):
+    version = current_version(conn)
+    if version != HEAD:
+        raise RuntimeError(
+            f"DB 스키마 버전({version})이 최신({HEAD})이 아닙니다. 'python migrate.py upgrade' 를 먼저 실행하세요."
+        )
@@ -1,7 +1,9 @@
 # 데이터베이스 테이블 Column 관련 모델들
 
 from model.databases.mysql import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from model.databases.types import CompressedText, SearchText
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import deferred
 
 class User(Base):
     __tablename__ = "users"
@@ -9,10 +11,28 @@ class User(Base):
     username = Column(String(100), unique=True, index=True)
     email = Column(String(200))
     hashed_password = Column(String(512))
+    # 메모가 바뀔 때마다 같은 트랜잭션에서 1 올린다. /memos/ 의 ETag 와 페이지 캐시 키로 쓴다.
+    memo_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+def _content_text_default(context):
+    # INSERT 에서 content_text 를 주지 않으면 content 로 채운다. UPDATE 는 저장소가 두 컬럼을 함께 바꾼다.
+    return context.get_current_parameters().get("content")
 
 class Memo(Base):
     __tablename__ = "memo"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String(100))
-    content = Column(String(1000))
\ No newline at end of file
+    # 길이 제한 없는 본문. 큰 본문은 압축해서 저장하고, ORM 으로 Memo 를 읽을 때는 접근할 때까지 불러오지 않는다.
+    content = deferred(Column(CompressedText()))
+    # 검색용 본문 사본(앞부분만, 압축하지 않음). fulltext 와 memory 검색 백엔드가 함께 쓴다.
+    content_text = deferred(Column(SearchText(), default=_content_text_default))
+
+    __table_args__ = (
+        # 목록 조회(user_id = ? AND id > ? ORDER BY id)와 소유권 확인(user_id = ? AND id IN ...)용.
+        # title 까지 포함해서 content 없는 목록 조회는 테이블을 읽지 않고 인덱스만으로 끝난다.
+        Index("ix_memo_user_id_id_title", "user_id", "id", "title"),
+        # /memos/search 의 fulltext 백엔드용. 한글 검색을 위해 ngram 파서를 사용한다.
+        # 본문은 압축된 BLOB 이라 FULLTEXT 인덱스에 넣을 수 없어 압축하지 않은 사본(content_text)을 색인한다.
+        Index("ft_memo_title_content_text", "title", "content_text", mysql_prefix="FULLTEXT", mysql_with_parser="ngram").ddl_if(dialect="mysql"),
+    )
@@ -0,0 +1,7 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from settings import Settings
+
+def create_mongo_database(settings: Settings):
+    """memo_backend 가 "mongo" 일 때 create_app 에서 app.state.mongo_database 로 만든다."""
+    client = AsyncIOMotorClient(settings.mongo_url)
+    return client[settings.mongo_db]
@@ -1,18 +1,125 @@
+import itertools
+from functools import lru_cache
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from settings import Settings
+from settings import Settings, get_settings
+from .pool import PoolStats, TimedAsyncQueuePool, attach_pool_stats
+from .sqlite import configure_sqlite, is_sqlite
 
-settings = Settings()
+class Database:
+    """엔진과 세션 팩토리를 처음 쓸 때 만든다. create_app 에서 app.state.database 로 등록된다.
 
-DATABASE_URL = settings.mysql_url
-engine = create_async_engine(DATABASE_URL, echo=True)
+    URL 이 SQLite 면 쓰기 엔진은 커넥션 하나만 두어 쓰기 요청이 풀에서 차례로 기다리게 하고
+    (단일 writer 큐), 읽기는 query_only 커넥션 풀로 보낸다.
+    """
 
-AsyncSessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-    class_=AsyncSession
-)
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._engine = None
+        self._session_factory = None
+        self._replica_engines = None
+        self._replica_session_factories = None
+        self._replica_cycle = None
+        self.is_sqlite = is_sqlite(settings.mysql_url)
+        # replica 를 따로 주지 않은 SQLite 는 같은 파일을 읽는 읽기 전용 풀을 replica 처럼 쓴다.
+        self.sqlite_reader = self.is_sqlite and not settings.replica_urls
 
-Base = declarative_base()
\ No newline at end of file
+    def _create_engine(self, url: str, **kwargs):
+        settings = self.settings
+        options = dict(
+            echo=settings.db_echo,
+            poolclass=TimedAsyncQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+        options.update(kwargs)
+        engine = create_async_engine(url, **options)
+        attach_pool_stats(engine)
+        return engine
+
+    @staticmethod
+    def _sessionmaker(engine) -> sessionmaker:
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            if self.is_sqlite:
+                # SQLite 는 쓰기 트랜잭션을 하나만 허용하므로 쓰기 커넥션도 하나만 둔다.
+                self._engine = self._create_engine(self.settings.mysql_url, pool_size=1, max_overflow=0)
+                configure_sqlite(self._engine, self.settings)
+            else:
+                self._engine = self._create_engine(self.settings.mysql_url)
+        return self._engine
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        return self.engine.sync_engine.pool.stats
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = self._sessionmaker(self.engine)
+        return self._session_factory
+
+    # 읽기 전용 조회(목록, 내보내기, 검색)를 보낼 replica. 설정하지 않으면 비어 있다.
+    @property
+    def replica_engines(self) -> list:
+        if self._replica_engines is None:
+            if self.sqlite_reader:
+                # 같은 파일을 읽는 커넥션 풀. WAL 이라 쓰기 중에도 커밋된 내용을 바로 읽는다.
+                urls = [self.settings.mysql_url]
+                options = {"pool_size": self.settings.sqlite_read_pool_size, "max_overflow": 0}
+            else:
+                urls = self.settings.replica_urls
+                options = {}
+            self._replica_engines = []
+            for url in urls:
+                replica = self._create_engine(url, **options)
+                if is_sqlite(url):
+                    configure_sqlite(replica, self.settings, read_only=True)
+                self._replica_engines.append(replica)
+        return self._replica_engines
+
+    @property
+    def replica_session_factories(self) -> list:
+        if self._replica_session_factories is None:
+            self._replica_session_factories = [self._sessionmaker(engine) for engine in self.replica_engines]
+            self._replica_cycle = itertools.cycle(self._replica_session_factories)
+        return self._replica_session_factories
+
+    def read_session_factory(self, use_primary: bool = False) -> sessionmaker:
+        # SQLite 읽기 커넥션은 복제 지연이 없으므로 방금 쓴 요청도 그대로 보낸다.
+        if (use_primary and not self.sqlite_reader) or not self.replica_session_factories:
+            return self.session_factory
+        return next(self._replica_cycle)
+
+    def session(self) -> AsyncSession:
+        return self.session_factory()
+
+    def engines(self) -> list:
+        return [self.engine, *self.replica_engines]
+
+    def pool_snapshot(self) -> dict:
+        snapshot = self.pool_stats.snapshot(self.engine.sync_engine.pool)
+        snapshot["replicas"] = [engine.sync_engine.pool.stats.snapshot(engine.sync_engine.pool) for engine in self.replica_engines]
+        return snapshot
+
+    def created_engines(self) -> list:
+        # engines() 와 달리 아직 만들지 않은 엔진을 새로 만들지 않는다.
+        return [engine for engine in [self._engine, *(self._replica_engines or [])] if engine is not None]
+
+    async def dispose(self):
+        for engine in self.created_engines():
+            await engine.dispose()
+
+# 앱 밖(migrate.py, 벤치마크)에서 쓰는 기본 Database. 앱은 create_app 에서 따로 만든다.
+@lru_cache
+def get_database() -> Database:
+    return Database(get_settings())
+
+Base = declarative_base()
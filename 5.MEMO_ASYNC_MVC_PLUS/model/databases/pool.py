@@ -0,0 +1,84 @@
+# 커넥션 풀 상태/대기 시간 수집
+
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, elapsed_ms: float):
+        self.wait_count += 1
+        self.wait_total_ms += elapsed_ms
+        self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    def snapshot(self, pool) -> dict:
+        histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+        histogram["le_inf"] = self.wait_buckets[-1]
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "wait": {
+                "count": self.wait_count,
+                "avg_ms": self.wait_total_ms / self.wait_count if self.wait_count else 0.0,
+                "max_ms": self.wait_max_ms,
+                "histogram": histogram,
+            },
+        }
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """커넥션을 얻기까지 기다린 시간을 PoolStats 에 기록하는 풀"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # engine.dispose() 가 풀을 새로 만들어도 통계는 이어서 쌓는다. (이벤트는 _dispatch 로 넘어간다)
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.observe_wait((time.perf_counter() - start) * 1000)
+
+def attach_pool_stats(engine) -> PoolStats:
+    pool = engine.sync_engine.pool
+    stats = pool.stats if isinstance(pool, TimedAsyncQueuePool) else PoolStats()
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.checkins += 1
+
+    return stats
@@ -0,0 +1,27 @@
+# SQLite(aiosqlite) 프로필: 로컬 테스트와 작은 단일 서버 배포용
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from settings import Settings
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def configure_sqlite(engine, settings: Settings, read_only: bool = False):
+    """커넥션을 열 때마다 WAL 과 pragma 를 설정한다."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL 에서는 읽기가 쓰기를 막지 않는다. NORMAL 은 WAL 에서 커밋마다 fsync 하지 않아도 안전하다.
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        # 음수는 페이지 수가 아니라 KiB 단위
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+        # 다른 프로세스(워커)가 쓰는 중이면 바로 "database is locked" 를 내지 않고 기다린다.
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
@@ -0,0 +1,87 @@
+# 메모 본문용 압축 컬럼 타입과 검색용 텍스트 컬럼 타입
+
+import zlib
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.types import LargeBinary, Text, TypeDecorator
+from settings import get_settings
+
+# 압축한 값 앞에 붙이는 표시. 일반 텍스트에는 NUL 문자가 없으므로
+# 압축하지 않은 값(예전 VARCHAR 데이터 포함)과 구분할 수 있다.
+COMPRESSED_PREFIX = b"\x00Z"
+
+class CompressedText(TypeDecorator):
+    """threshold 바이트 이상인 문자열은 zlib 으로 압축해 BLOB 으로 저장한다.
+    threshold/level 을 주지 않으면 처음 저장할 때 Settings 에서 읽는다."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, threshold: int | None = None, level: int | None = None):
+        super().__init__()
+        self.threshold = threshold
+        self.level = level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if self.threshold is None or self.level is None:
+            settings = get_settings()
+            self.threshold = settings.memo_compress_threshold if self.threshold is None else self.threshold
+            self.level = settings.memo_compress_level if self.level is None else self.level
+        raw = value.encode("utf-8")
+        if len(raw) >= self.threshold:
+            return COMPRESSED_PREFIX + zlib.compress(raw, self.level)
+        return raw
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # 타입을 바꾸기 전에 텍스트로 저장된 값 (SQLite)
+            return value
+        value = bytes(value)
+        if value.startswith(COMPRESSED_PREFIX):
+            return zlib.decompress(value[len(COMPRESSED_PREFIX):]).decode("utf-8")
+        return value.decode("utf-8")
+
+# 검색 대상으로 남기는 본문 앞부분 길이(문자). 두 검색 백엔드가 같은 범위를 검색한다.
+SEARCH_TEXT_CHARS = 8192
+
+def search_text(content: str | None) -> str | None:
+    return content[:SEARCH_TEXT_CHARS] if content is not None else None
+
+class SearchText(TypeDecorator):
+    """압축하지 않은 본문 앞부분(SEARCH_TEXT_CHARS 문자). 압축 BLOB 은 FULLTEXT 인덱스에 넣을 수 없어 따로 둔다.
+    utf8mb4 로 8192 자는 TEXT(64KB) 를 넘을 수 있어 MySQL 에서는 MEDIUMTEXT 를 쓴다."""
+
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(MEDIUMTEXT())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        return search_text(value)
+
+def iter_decompressed(stored, chunk_size: int = 64 * 1024):
+    """DB 에 저장된 원본 값을 chunk_size 단위로 풀어서 bytes 로 돌려준다."""
+    if stored is None:
+        return
+    if isinstance(stored, str):
+        stored = stored.encode("utf-8")
+    stored = bytes(stored)
+    if not stored.startswith(COMPRESSED_PREFIX):
+        for start in range(0, len(stored), chunk_size):
+            yield stored[start:start + chunk_size]
+        return
+    decompressor = zlib.decompressobj()
+    data = memoryview(stored)[len(COMPRESSED_PREFIX):]
+    for start in range(0, len(data), chunk_size):
+        chunk = decompressor.decompress(data[start:start + chunk_size])
+        if chunk:
+            yield chunk
+    tail = decompressor.flush()
+    if tail:
+        yield tail
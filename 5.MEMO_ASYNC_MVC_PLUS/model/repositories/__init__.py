@@ -0,0 +1 @@
+from .memos import MemoRepository, SQLMemoRepository
@@ -0,0 +1,200 @@
+# 메모 저장소 인터페이스와 SQLAlchemy 구현
+
+from typing import AsyncIterator, Protocol
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import LargeBinary, bindparam, delete, insert, type_coerce, update
+from sqlalchemy.future import select
+from model.databases.models import Memo, User
+from model.databases.types import iter_decompressed
+
+class MemoRepository(Protocol):
+    # 사용자의 메모가 바뀔 때마다 올라가는 값. 모든 워커가 같은 값을 본다.
+    async def version(self, user_id: int) -> int: ...
+
+    async def create(self, user_id: int, title: str, content: str) -> dict: ...
+
+    async def list_page(self, user_id: int, cursor: int | None, limit: int, include_content: bool) -> tuple[list, int | None]: ...
+
+    async def update(self, user_id: int, memo_id: int, title: str | None, content: str | None) -> dict | None: ...
+
+    async def delete(self, user_id: int, memo_id: int) -> bool: ...
+
+    async def content_chunks(self, user_id: int, memo_id: int) -> AsyncIterator[bytes] | None: ...
+
+    # 일괄 처리는 한 번에 저장한다. 생성은 id 목록(입력 순서)을, 수정/삭제는 실제로 처리한 id 를 돌려준다.
+    async def bulk_create(self, user_id: int, items: list[tuple[str, str]]) -> list[int]: ...
+
+    async def bulk_update(self, user_id: int, items: list[tuple[int, str | None, str | None]]) -> set[int]: ...
+
+    async def bulk_delete(self, user_id: int, memo_ids: list[int]) -> set[int]: ...
+
+def _memo_dict(memo_id, user_id, title, content) -> dict:
+    return {"id": memo_id, "user_id": user_id, "title": title, "content": content}
+
+def _changes(title, content) -> dict:
+    # 본문을 바꾸면 검색용 사본(content_text)도 같은 문장에서 바꾼다.
+    changes = {}
+    if title is not None:
+        changes["title"] = title
+    if content is not None:
+        changes["content"] = content
+        changes["content_text"] = content
+    return changes
+
+def _split_page(rows: list, limit: int) -> tuple[list, int | None]:
+    # 다음 페이지 유무를 알기 위해 limit + 1개를 가져온다.
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["id"]
+    return rows, None
+
+class SQLMemoRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def version(self, user_id):
+        result = await self.db.execute(select(User.memo_version).where(User.id == user_id))
+        return result.scalar() or 0
+
+    # 메모를 바꾼 트랜잭션 안에서 버전을 올려, 커밋된 메모와 버전이 항상 함께 보이게 한다.
+    async def _bump_version(self, user_id):
+        await self.db.execute(
+            update(User).where(User.id == user_id).values(memo_version=User.memo_version + 1).execution_options(synchronize_session=False)
+        )
+
+    async def create(self, user_id, title, content):
+        new_memo = Memo(user_id=user_id, title=title, content=content)
+        self.db.add(new_memo)
+        # content 는 deferred 라 refresh 대신 flush 로 id 만 받아 온다.
+        await self.db.flush()
+        memo_id = new_memo.id
+        await self._bump_version(user_id)
+        await self.db.commit()
+        return _memo_dict(memo_id, user_id, title, content)
+
+    # Memo.id 기준 keyset 페이지네이션
+    async def list_page(self, user_id, cursor, limit, include_content):
+        columns = [Memo.id, Memo.title]
+        if include_content:
+            columns.append(Memo.content)
+        query = select(*columns).where(Memo.user_id == user_id)
+        if cursor is not None:
+            query = query.where(Memo.id > cursor)
+        query = query.order_by(Memo.id).limit(limit + 1)
+        result = await self.db.execute(query)
+        return _split_page([dict(row) for row in result.mappings().all()], limit)
+
+    # 소유권 확인과 수정을 UPDATE ... WHERE id = ? AND user_id = ? 한 문장으로 처리한다.
+    async def update(self, user_id, memo_id, title, content):
+        changes = _changes(title, content)
+        condition = (Memo.id == memo_id, Memo.user_id == user_id)
+        columns = (Memo.id, Memo.user_id, Memo.title, Memo.content)
+
+        if not changes:
+            result = await self.db.execute(select(*columns).where(*condition))
+            row = result.first()
+            return _memo_dict(*row) if row is not None else None
+
+        stmt = update(Memo).where(*condition).values(changes).execution_options(synchronize_session=False)
+        if self.db.get_bind().dialect.update_returning:
+            result = await self.db.execute(stmt.returning(*columns))
+            row = result.first()
+            if row is not None:
+                await self._bump_version(user_id)
+            await self.db.commit()
+            return _memo_dict(*row) if row is not None else None
+
+        # RETURNING 이 없는 MySQL 은 rowcount(FOUND_ROWS)로 존재 여부를 판단한다.
+        result = await self.db.execute(stmt)
+        if result.rowcount == 0:
+            await self.db.commit()
+            return None
+        await self._bump_version(user_id)
+        await self.db.commit()
+        if title is not None and content is not None:
+            return _memo_dict(memo_id, user_id, title, content)
+        # 커밋한 뒤에 다시 읽으므로 그 사이 지워졌을 수 있다.
+        result = await self.db.execute(select(*columns).where(*condition))
+        row = result.first()
+        return _memo_dict(*row) if row is not None else None
+
+    async def delete(self, user_id, memo_id):
+        result = await self.db.execute(
+            delete(Memo).where(Memo.id == memo_id, Memo.user_id == user_id).execution_options(synchronize_session=False)
+        )
+        deleted = result.rowcount > 0
+        if deleted:
+            await self._bump_version(user_id)
+        await self.db.commit()
+        return deleted
+
+    # 요청한 id 중 이 사용자의 메모인 것만 한 번의 쿼리로 골라낸다.
+    async def owned_ids(self, user_id, memo_ids) -> set:
+        if not memo_ids:
+            return set()
+        result = await self.db.execute(select(Memo.id).where(Memo.user_id == user_id, Memo.id.in_(memo_ids)))
+        return set(result.scalars().all())
+
+    async def bulk_create(self, user_id, items):
+        if not items:
+            return []
+        # 여러 줄 VALUES 에서는 content_text 의 INSERT 기본값이 줄별 파라미터를 읽지 못하므로 직접 채운다.
+        values = [{"user_id": user_id, "title": title, "content": content, "content_text": content} for title, content in items]
+        if self.db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            # insertmanyvalues 로 묶어 INSERT 하고 id 는 입력 순서대로 돌려받는다.
+            # 순서를 보장할 방법이 없는 dialect(SQLite)에서는 SQLAlchemy 가 한 줄씩 실행한다.
+            result = await self.db.execute(insert(Memo).returning(Memo.id, sort_by_parameter_order=True), values)
+            ids = list(result.scalars().all())
+        else:
+            # RETURNING 이 없는 MySQL 은 여러 줄 INSERT 한 문장으로 넣는다. 이때 LAST_INSERT_ID() 는 첫 줄의 id 이고,
+            # 줄 수를 미리 아는 INSERT(simple insert)에는 InnoDB 가 autoinc 잠금 모드와 상관없이 연속된 id 를 준다.
+            # (auto_increment_increment 가 1 이라고 가정한다.)
+            result = await self.db.execute(insert(Memo).values(values))
+            ids = list(range(result.lastrowid, result.lastrowid + result.rowcount))
+        await self._bump_version(user_id)
+        await self.db.commit()
+        return ids
+
+    async def bulk_update(self, user_id, items):
+        owned = await self.owned_ids(user_id, [memo_id for memo_id, _, _ in items])
+        # 바꿀 컬럼 조합별로 묶어서 executemany 로 실행한다.
+        groups = {}
+        for memo_id, title, content in items:
+            changes = _changes(title, content)
+            if memo_id in owned and changes:
+                groups.setdefault(tuple(changes), []).append({"_id": memo_id, **changes})
+
+        table = Memo.__table__
+        for fields, params in groups.items():
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("_id"), table.c.user_id == user_id)
+                .values({field: bindparam(field) for field in fields})
+            )
+            await self.db.execute(stmt, params)
+        if groups:
+            await self._bump_version(user_id)
+        await self.db.commit()
+        return owned
+
+    async def bulk_delete(self, user_id, memo_ids):
+        owned = await self.owned_ids(user_id, memo_ids)
+        if owned:
+            await self.db.execute(delete(Memo).where(Memo.user_id == user_id, Memo.id.in_(owned)))
+            await self._bump_version(user_id)
+        await self.db.commit()
+        return owned
+
+    # 압축된 원본을 그대로 읽어 와서 조금씩 풀어 가며 내보낸다.
+    async def content_chunks(self, user_id, memo_id):
+        result = await self.db.execute(
+            select(type_coerce(Memo.content, LargeBinary)).where(Memo.id == memo_id, Memo.user_id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return _iterate(iter_decompressed(row[0]))
+
+async def _iterate(chunks) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
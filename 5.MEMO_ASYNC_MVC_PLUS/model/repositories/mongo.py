@@ -0,0 +1,121 @@
+# MongoDB(Motor) 메모 저장소
+
+from pymongo import ReturnDocument, UpdateOne
+from model.databases.types import iter_decompressed
+from .memos import _iterate, _memo_dict, _split_page
+
+class MongoMemoRepository:
+    """memo 컬렉션에 저장한다. 기존 API와 맞추기 위해 _id 는 counters 컬렉션에서 발급한 정수를 쓴다."""
+
+    def __init__(self, database):
+        self.memos = database["memo"]
+        self.counters = database["counters"]
+
+    async def ensure_indexes(self):
+        await self.memos.create_index([("user_id", 1), ("_id", 1)])
+
+    async def _next_id(self, count: int = 1) -> int:
+        """count 개의 id 를 한 번에 발급하고 마지막 id 를 돌려준다."""
+        counter = await self.counters.find_one_and_update(
+            {"_id": "memo"},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter["seq"]
+
+    async def version(self, user_id):
+        counter = await self.counters.find_one({"_id": f"version:{user_id}"})
+        return counter["seq"] if counter is not None else 0
+
+    # 메모를 바꾼 뒤에 올린다. 그 사이에 읽은 쪽은 새 메모를 예전 버전으로 보게 되지만 곧 버전이 바뀌어 다시 읽는다.
+    async def _bump_version(self, user_id):
+        await self.counters.update_one({"_id": f"version:{user_id}"}, {"$inc": {"seq": 1}}, upsert=True)
+
+    async def create(self, user_id, title, content):
+        memo_id = await self._next_id()
+        await self.memos.insert_one({"_id": memo_id, "user_id": user_id, "title": title, "content": content})
+        await self._bump_version(user_id)
+        return _memo_dict(memo_id, user_id, title, content)
+
+    async def list_page(self, user_id, cursor, limit, include_content):
+        query = {"user_id": user_id}
+        if cursor is not None:
+            query["_id"] = {"$gt": cursor}
+        projection = {"_id": 1, "title": 1}
+        if include_content:
+            projection["content"] = 1
+        documents = self.memos.find(query, projection).sort("_id", 1).limit(limit + 1)
+        rows = []
+        async for document in documents:
+            row = {"id": document.pop("_id")}
+            row.update(document)
+            rows.append(row)
+        return _split_page(rows, limit)
+
+    async def update(self, user_id, memo_id, title, content):
+        changes = {}
+        if title is not None:
+            changes["title"] = title
+        if content is not None:
+            changes["content"] = content
+        query = {"_id": memo_id, "user_id": user_id}
+        if changes:
+            document = await self.memos.find_one_and_update(query, {"$set": changes}, return_document=ReturnDocument.AFTER)
+        else:
+            document = await self.memos.find_one(query)
+        if document is None:
+            return None
+        if changes:
+            await self._bump_version(user_id)
+        return _memo_dict(document["_id"], document["user_id"], document.get("title"), document.get("content"))
+
+    async def delete(self, user_id, memo_id):
+        result = await self.memos.delete_one({"_id": memo_id, "user_id": user_id})
+        if result.deleted_count != 1:
+            return False
+        await self._bump_version(user_id)
+        return True
+
+    async def _owned_ids(self, user_id, memo_ids) -> set:
+        if not memo_ids:
+            return set()
+        documents = self.memos.find({"user_id": user_id, "_id": {"$in": list(memo_ids)}}, {"_id": 1})
+        return {document["_id"] async for document in documents}
+
+    async def bulk_create(self, user_id, items):
+        if not items:
+            return []
+        last_id = await self._next_id(len(items))
+        ids = list(range(last_id - len(items) + 1, last_id + 1))
+        await self.memos.insert_many([
+            {"_id": memo_id, "user_id": user_id, "title": title, "content": content}
+            for memo_id, (title, content) in zip(ids, items)
+        ])
+        await self._bump_version(user_id)
+        return ids
+
+    async def bulk_update(self, user_id, items):
+        owned = await self._owned_ids(user_id, [memo_id for memo_id, _, _ in items])
+        operations = []
+        for memo_id, title, content in items:
+            changes = {field: value for field, value in (("title", title), ("content", content)) if value is not None}
+            if memo_id in owned and changes:
+                operations.append(UpdateOne({"_id": memo_id, "user_id": user_id}, {"$set": changes}))
+        if operations:
+            await self.memos.bulk_write(operations, ordered=True)
+            await self._bump_version(user_id)
+        return owned
+
+    async def bulk_delete(self, user_id, memo_ids):
+        owned = await self._owned_ids(user_id, memo_ids)
+        if owned:
+            await self.memos.delete_many({"user_id": user_id, "_id": {"$in": list(owned)}})
+            await self._bump_version(user_id)
+        return owned
+
+    async def content_chunks(self, user_id, memo_id):
+        document = await self.memos.find_one({"_id": memo_id, "user_id": user_id}, {"content": 1})
+        if document is None:
+            return None
+        return _iterate(iter_decompressed(document.get("content")))
@@ -0,0 +1,181 @@
+# 메모 검색 인덱스 (MySQL FULLTEXT / 프로세스 내 역색인)
+
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Protocol
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from model.databases.models import Memo
+from model.databases.types import search_text
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str | None) -> list:
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+class SearchIndex(Protocol):
+    """검색 백엔드 공통 인터페이스. 증분 갱신이 필요 없는 백엔드는 add/remove/invalidate 를 무시하고
+    loaded/contains 는 False 를 돌려준다."""
+
+    async def search(self, db: AsyncSession, user_id: int, q: str, offset: int, limit: int) -> list: ...
+
+    def add(self, user_id: int, memo_id: int, title: str | None, content: str | None): ...
+
+    def remove(self, user_id: int, memo_id: int): ...
+
+    def invalidate(self, user_id: int): ...
+
+    def loaded(self, user_id: int) -> bool: ...
+
+    def contains(self, user_id: int, memo_id: int) -> bool: ...
+
+class FullTextSearchIndex:
+    """memo(title, content_text) 의 MySQL FULLTEXT 인덱스를 사용한다.
+    본문은 압축되지 않은 앞부분 사본(content_text)으로 검색한다."""
+
+    def add(self, user_id, memo_id, title, content):
+        pass
+
+    def remove(self, user_id, memo_id):
+        pass
+
+    def invalidate(self, user_id):
+        pass
+
+    def loaded(self, user_id):
+        return False
+
+    def contains(self, user_id, memo_id):
+        return False
+
+    async def search(self, db, user_id, q, offset, limit):
+        score = match(Memo.title, Memo.content_text, against=q)
+        query = (
+            select(Memo.id, Memo.title, score.label("score"))
+            .where(Memo.user_id == user_id, score)
+            .order_by(score.desc(), Memo.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+
+class _UserIndex:
+    def __init__(self):
+        self.postings: dict[str, dict[int, int]] = {}
+        self.doc_terms: dict[int, Counter] = {}
+        self.titles: dict[int, str] = {}
+        self.loaded_at = time.monotonic()
+
+class InvertedSearchIndex:
+    """사용자별 토큰 역색인. 첫 검색 때 DB에서 만들고 이후 CRUD 마다 증분 갱신한다.
+    전체 메모 수가 max_docs 를 넘으면 오래 검색하지 않은 사용자부터 버린다.
+    워커 프로세스마다 따로 존재해 다른 워커의 변경은 증분 갱신되지 않으므로, ttl 초가 지나면 DB 에서 다시 만든다."""
+
+    def __init__(self, max_docs: int = 100_000, ttl: float = 300.0):
+        self.max_docs = max_docs
+        self.ttl = ttl
+        self.docs = 0
+        self._users: OrderedDict[int, _UserIndex] = OrderedDict()
+
+    async def _load(self, db: AsyncSession, user_id: int) -> _UserIndex:
+        index = self._users.get(user_id)
+        if index is not None and time.monotonic() - index.loaded_at > self.ttl:
+            self.invalidate(user_id)
+            index = None
+        if index is None:
+            index = _UserIndex()
+            # fulltext 와 같은 범위를 검색하도록 검색용 사본을 읽는다. 압축을 풀 필요도 없다.
+            result = await db.execute(select(Memo.id, Memo.title, Memo.content_text).where(Memo.user_id == user_id))
+            for memo_id, title, content in result.all():
+                self._add(index, memo_id, title, content)
+            # 읽는 동안 다른 요청이 같은 사용자를 먼저 올렸을 수 있다.
+            self.invalidate(user_id)
+            self._users[user_id] = index
+            self.docs += len(index.doc_terms)
+            self._evict(keep=user_id)
+        else:
+            self._users.move_to_end(user_id)
+        return index
+
+    def _evict(self, keep: int):
+        while self.docs > self.max_docs and len(self._users) > 1:
+            user_id = next(iter(self._users))
+            if user_id == keep:
+                self._users.move_to_end(user_id)
+                continue
+            self.invalidate(user_id)
+
+    def _add(self, index: _UserIndex, memo_id, title, content):
+        self._remove(index, memo_id)
+        terms = Counter(tokenize(title)) + Counter(tokenize(search_text(content)))
+        index.doc_terms[memo_id] = terms
+        index.titles[memo_id] = title
+        for term, tf in terms.items():
+            index.postings.setdefault(term, {})[memo_id] = tf
+
+    def _remove(self, index: _UserIndex, memo_id):
+        terms = index.doc_terms.pop(memo_id, None)
+        index.titles.pop(memo_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = index.postings.get(term)
+            if posting is not None:
+                posting.pop(memo_id, None)
+                if not posting:
+                    del index.postings[term]
+
+    def add(self, user_id, memo_id, title, content):
+        index = self._users.get(user_id)
+        if index is not None:
+            before = len(index.doc_terms)
+            self._add(index, memo_id, title, content)
+            self.docs += len(index.doc_terms) - before
+            self._evict(keep=user_id)
+
+    def remove(self, user_id, memo_id):
+        index = self._users.get(user_id)
+        if index is not None:
+            before = len(index.doc_terms)
+            self._remove(index, memo_id)
+            self.docs += len(index.doc_terms) - before
+
+    def invalidate(self, user_id):
+        index = self._users.pop(user_id, None)
+        if index is not None:
+            self.docs -= len(index.doc_terms)
+
+    def loaded(self, user_id):
+        return user_id in self._users
+
+    def contains(self, user_id, memo_id):
+        index = self._users.get(user_id)
+        return index is not None and memo_id in index.doc_terms
+
+    async def search(self, db, user_id, q, offset, limit):
+        index = await self._load(db, user_id)
+        n_docs = len(index.doc_terms)
+        scores: dict[int, float] = {}
+        for term in set(tokenize(q)):
+            posting = index.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + n_docs / len(posting))
+            for memo_id, tf in posting.items():
+                scores[memo_id] = scores.get(memo_id, 0.0) + (1 + math.log(tf)) * idf
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {"id": memo_id, "title": index.titles[memo_id], "score": score}
+            for memo_id, score in ranked[offset:offset + limit]
+        ]
+
+def create_search_index(backend: str, max_docs: int = 100_000, ttl: float = 300.0) -> SearchIndex:
+    if backend == "fulltext":
+        return FullTextSearchIndex()
+    return InvertedSearchIndex(max_docs, ttl)
@@ -0,0 +1,102 @@
+# 운영용 실행 진입점
+#
+# python serve.py [--workers N] [--host 0.0.0.0] [--port 8000] [--gunicorn [--preload]]
+#
+# uvicorn 워커(기본)는 각 워커 프로세스에서 main 을 import 하므로 DB 엔진도 워커마다 따로 만들어진다.
+# gunicorn --preload 로 마스터에서 앱을 미리 불러오면 fork 한 뒤 물려받은 커넥션 풀을 버리고 새로 연다.
+# 워커를 여러 개 띄울 때 프로세스마다 따로 갖는 상태가 있으면 시작 전에 경고하고, 메모리 세션 저장소면 거부한다.
+# SIGTERM 을 받으면 처리 중인 요청을 shutdown_timeout 초까지 기다린 뒤 app_lifespan 종료 단계에서
+# 자동 저장 큐를 비우고 엔진을 정리한다.
+
+import argparse
+import os
+import sys
+from settings import get_settings
+
+APP = "main:application"
+settings = get_settings()
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+def check_workers(settings, workers: int) -> tuple[list, list]:
+    """(오류, 경고). 워커끼리 공유되지 않는 프로세스 로컬 상태를 찾는다."""
+    errors, warnings = [], []
+    if workers <= 1:
+        return errors, warnings
+    from model.databases.sqlite import is_sqlite
+
+    if settings.session_backend == "memory":
+        errors.append("SESSION_BACKEND=memory 는 워커마다 세션이 따로 있어 요청마다 로그인이 풀립니다. redis 나 cookie 를 쓰세요.")
+    if settings.search_backend == "memory":
+        warnings.append(f"검색 역색인이 워커마다 따로 있어 다른 워커의 변경은 최대 {settings.search_index_ttl:g}초 늦게 반영됩니다.")
+    if settings.memo_page_cache_bytes > 0:
+        warnings.append(f"/memos/ 페이지 캐시를 워커마다 따로 가져 메모리를 최대 {workers} x {settings.memo_page_cache_bytes} 바이트 씁니다.")
+    if settings.login_rate_limit_backend == "memory":
+        warnings.append(f"로그인 시도 제한이 워커마다 따로 세어져 실제 한도가 최대 {workers}배가 됩니다. redis 를 쓰세요.")
+    if is_sqlite(settings.mysql_url):
+        warnings.append("SQLite 는 워커끼리 busy_timeout 으로만 쓰기를 기다립니다. --workers 1 을 권장합니다.")
+    return errors, warnings
+
+def run_uvicorn(args):
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=settings.shutdown_timeout,
+        log_level=args.log_level,
+    )
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    def post_fork(server, worker):
+        # preload 때 마스터에서 만든 풀의 커넥션을 자식이 같이 쓰지 않도록 버린다(닫지는 않음).
+        # 아직 만들지 않은 엔진은 자식이 처음 쓸 때 만든다.
+        from main import application
+        for forked in application.state.database.created_engines():
+            forked.sync_engine.dispose(close=False)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("graceful_timeout", settings.shutdown_timeout)
+            self.cfg.set("preload_app", args.preload)
+            if args.preload:
+                self.cfg.set("post_fork", post_fork)
+            self.cfg.set("loglevel", args.log_level)
+
+        def load(self):
+            from main import application
+            return application
+
+    Application().run()
+
+def main():
+    parser = argparse.ArgumentParser(description="메모 앱 실행")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--gunicorn", action="store_true", help="gunicorn + UvicornWorker 로 실행")
+    parser.add_argument("--preload", action="store_true", help="gunicorn 마스터에서 앱을 미리 불러옴")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    errors, warnings = check_workers(settings, args.workers)
+    for warning in warnings:
+        print(f"경고: {warning}", file=sys.stderr)
+    if errors:
+        parser.error(" ".join(errors))
+
+    if args.gunicorn:
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+
+if __name__ == "__main__":
+    main()
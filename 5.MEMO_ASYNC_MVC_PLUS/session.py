@@ -0,0 +1,205 @@
+# 서버 사이드 세션 저장소와 미들웨어
+# 쿠키에는 불투명한 세션 id 만 담고, 세션 데이터는 저장소에 둔다.
+# 지운 세션 id 는 TTL 동안 폐기 목록에 남겨, 그 id 로 늦게 끝난 요청이 세션을 되살리지 못하게 한다.
+
+import json
+import secrets
+import time
+from collections import OrderedDict
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+class MemorySessionStore:
+    """프로세스 로컬 LRU 세션 저장소. 조회할 때마다 만료 시간이 연장된다(sliding expiration)."""
+
+    def __init__(self, ttl: int, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._user_sessions: dict[str, set] = {}
+        # 폐기된 세션 id -> 폐기 기록이 만료되는 시각. 같은 TTL 로 넣으므로 앞쪽이 먼저 만료된다.
+        self._revoked: OrderedDict[str, float] = OrderedDict()
+
+    async def get(self, session_id: str) -> dict | None:
+        entry = self._data.get(session_id)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if expires_at < time.monotonic():
+            self._discard(session_id)
+            return None
+        self._data[session_id] = (data, time.monotonic() + self.ttl)
+        self._data.move_to_end(session_id)
+        return dict(data)
+
+    async def set(self, session_id: str, data: dict):
+        if self._is_revoked(session_id):
+            return
+        self._discard(session_id)
+        self._data[session_id] = (dict(data), time.monotonic() + self.ttl)
+        username = data.get("username")
+        if username is not None:
+            self._user_sessions.setdefault(username, set()).add(session_id)
+        while len(self._data) > self.max_entries:
+            self._discard(next(iter(self._data)))
+
+    async def touch(self, session_id: str):
+        # get 에서 이미 만료 시간을 연장했다.
+        pass
+
+    async def delete(self, session_id: str):
+        self._discard(session_id)
+        self._revoke(session_id)
+
+    async def revoke_user(self, username: str):
+        for session_id in list(self._user_sessions.get(username, ())):
+            self._discard(session_id)
+            self._revoke(session_id)
+
+    def _revoke(self, session_id: str):
+        now = time.monotonic()
+        while self._revoked and next(iter(self._revoked.values())) < now:
+            self._revoked.popitem(last=False)
+        self._revoked.pop(session_id, None)
+        self._revoked[session_id] = now + self.ttl
+        while len(self._revoked) > self.max_entries:
+            self._revoked.popitem(last=False)
+
+    def _is_revoked(self, session_id: str) -> bool:
+        expires_at = self._revoked.get(session_id)
+        return expires_at is not None and expires_at >= time.monotonic()
+
+    def _discard(self, session_id: str):
+        entry = self._data.pop(session_id, None)
+        if entry is None:
+            return
+        username = entry[0].get("username")
+        sessions = self._user_sessions.get(username)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._user_sessions[username]
+
+class RedisSessionStore:
+    """여러 워커가 공유하는 Redis 세션 저장소"""
+
+    def __init__(self, redis, ttl: int, prefix: str = "session:"):
+        self.redis = redis
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _user_key(self, username: str) -> str:
+        return self.prefix + "user:" + username
+
+    def _revoked_key(self, session_id: str) -> str:
+        return self.prefix + "revoked:" + session_id
+
+    async def get(self, session_id):
+        raw = await self.redis.get(self._key(session_id))
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, session_id, data):
+        from redis.exceptions import WatchError
+
+        # 폐기 표시를 WATCH 해서, 확인한 뒤 저장하기 전에 폐기되면 트랜잭션이 취소되게 한다.
+        revoked_key = self._revoked_key(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(revoked_key)
+                if await pipe.exists(revoked_key):
+                    return
+                pipe.multi()
+                pipe.set(self._key(session_id), json.dumps(data), ex=self.ttl)
+                username = data.get("username")
+                if username is not None:
+                    pipe.sadd(self._user_key(username), session_id)
+                    pipe.expire(self._user_key(username), self.ttl)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def touch(self, session_id):
+        await self.redis.expire(self._key(session_id), self.ttl)
+
+    async def delete(self, session_id):
+        await self._revoke([session_id])
+
+    async def revoke_user(self, username):
+        user_key = self._user_key(username)
+        session_ids = await self.redis.smembers(user_key)
+        await self._revoke([sid.decode() if isinstance(sid, bytes) else sid for sid in session_ids], user_key)
+
+    async def _revoke(self, session_ids: list, *keys):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for session_id in session_ids:
+                pipe.set(self._revoked_key(session_id), 1, ex=self.ttl)
+            pipe.delete(*keys, *(self._key(session_id) for session_id in session_ids))
+            await pipe.execute()
+
+def create_session_store(settings):
+    if settings.session_backend == "memory":
+        return MemorySessionStore(ttl=settings.session_ttl, max_entries=settings.session_max_entries)
+    if settings.session_backend == "redis":
+        from redis.asyncio import Redis
+        return RedisSessionStore(Redis.from_url(settings.redis_url), ttl=settings.session_ttl)
+    return None
+
+def rotate_session(request):
+    """로그인/로그아웃 때 호출한다. 응답을 보낼 때 ServerSessionMiddleware 가 예전 세션 id 를 폐기하고
+    데이터를 새 id 로 옮긴다(세션 고정 방지). 쿠키 세션(SessionMiddleware)에서는 아무 일도 하지 않는다."""
+    request.scope["session_rotate"] = True
+
+class ServerSessionMiddleware:
+    """SessionMiddleware 와 같은 request.session 인터페이스를 제공한다."""
+
+    def __init__(self, app, store, session_cookie: str = "session_id", max_age: int | None = None, https_only: bool = False):
+        self.app = app
+        self.store = store
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.security_flags = "httponly; samesite=lax"
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        session_id = connection.cookies.get(self.session_cookie)
+        loaded = None
+        if session_id is not None:
+            loaded = await self.store.get(session_id)
+            if loaded is None:
+                session_id = None
+        scope["session"] = dict(loaded or {})
+
+        async def send_wrapper(message):
+            nonlocal session_id, loaded
+            if message["type"] == "http.response.start":
+                session = scope["session"]
+                headers = MutableHeaders(scope=message)
+                cleared = False
+                if session_id is not None and (not session or scope.get("session_rotate")):
+                    await self.store.delete(session_id)
+                    session_id, loaded, cleared = None, None, True
+                if session:
+                    if session_id is None:
+                        session_id = secrets.token_urlsafe(32)
+                    if session != loaded:
+                        await self.store.set(session_id, session)
+                    else:
+                        await self.store.touch(session_id)
+                    max_age = f"Max-Age={self.max_age}; " if self.max_age else ""
+                    headers.append("Set-Cookie", f"{self.session_cookie}={session_id}; path=/; {max_age}{self.security_flags}")
+                elif cleared:
+                    headers.append("Set-Cookie", f"{self.session_cookie}=null; path=/; expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -8,7 +9,98 @@ class Settings(BaseSettings):
     secret_key: str
     test_env: str = "test value입니다."
 
+    # DB 커넥션 풀
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_echo: bool = False
+    # 읽기 replica (예: REPLICA_URLS='["mysql+aiomysql://..."]')
+    replica_urls: list[str] = []
+    # 마지막 쓰기 후 이 시간(초) 동안은 primary 에서 읽는다(read-your-writes).
+    replica_read_after_write: float = 5.0
+    # 시작할 때 미리 열어 둘 커넥션 수 (0 이면 하지 않음)
+    db_pool_warm: int = 0
+    # SIGTERM 후 처리 중인 요청을 기다리는 시간(초)
+    shutdown_timeout: int = 30
+    # /internal/*, /metrics 접근 토큰. 비어 있으면 404 로 숨기고, 있으면 "Authorization: Bearer <토큰>" 을 요구한다.
+    internal_endpoints_token: str = ""
+    # 시작할 때 스키마 처리 ("check": 버전만 확인, "migrate": 마이그레이션 적용, "create_all": 예전 방식)
+    db_schema_startup: str = "check"
+    # SQLite (MYSQL_URL 을 sqlite+aiosqlite:///memo.db 처럼 파일 DB 로 주면 사용)
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_pool_size: int = 4
+
+    # 비밀번호 해시 방식과 비용. 첫 번째 방식으로 저장하고 나머지는 로그인할 때 다시 해시한다.
+    password_schemes: list[str] = ["bcrypt"]
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    # 0 보다 크면 시작할 때 해시 한 번이 이 시간(ms) 안에 끝나도록 비용을 맞춘다.
+    password_hash_budget_ms: float = 0
+
+    # 비밀번호 해싱 워커 풀 ("thread" 또는 "process")
+    hash_executor: str = "thread"
+    hash_workers: int = 4
+    hash_max_concurrency: int = 8
+
+    # 로그인 시도 제한 (window 초 동안 attempts 번까지, "memory" 또는 "redis")
+    login_rate_limit_backend: str = "memory"
+    login_user_attempts: int = 5
+    login_user_window: float = 60.0
+    login_ip_attempts: int = 20
+    login_ip_window: float = 60.0
+
+    # username -> user id 캐시
+    user_cache_size: int = 1024
+    user_cache_ttl: float = 300.0
+
+    # 메모 목록 페이지 크기
+    memo_page_size: int = 20
+    memo_page_size_max: int = 100
+    memo_export_chunk_size: int = 500
+    memo_bulk_max: int = 1000
+    # 메모 본문 압축 (이 크기(바이트) 이상이면 zlib 으로 압축)
+    memo_compress_threshold: int = 1024
+    memo_compress_level: int = 6
+    # 자동 저장 write-behind 큐
+    autosave_flush_interval: float = 2.0
+    autosave_max_batch: int = 500
+    # 렌더링된 /memos/ 페이지 캐시 크기 (0 이면 사용하지 않음)
+    memo_page_cache_bytes: int = 16 * 1024 * 1024
+
+    # 세션 저장소 ("cookie", "memory" 또는 "redis")
+    session_backend: str = "cookie"
+    session_ttl: int = 14 * 24 * 60 * 60
+    session_max_entries: int = 100000
+    redis_url: str = "redis://localhost:6379/0"
+
+    # Jinja2 템플릿 ("" 이면 바이트코드 캐시를 쓰지 않음)
+    template_cache_dir: str = BASE_DIR + '/.jinja_cache'
+    template_auto_reload: bool = False
+    template_preload: bool = True
+
+    # 메모 저장소 ("sql" 또는 "mongo")
+    memo_backend: str = "sql"
+    mongo_url: str = "mongodb://localhost:27017"
+    mongo_db: str = "my_memo_app"
+
+    # 메모 검색 백엔드 ("memory" 또는 "fulltext")
+    search_backend: str = "memory"
+    # "memory" 역색인이 메모리에 들고 있는 최대 메모 수(넘으면 오래 안 쓴 사용자부터 버림)와 재구성 주기(초)
+    search_index_max_docs: int = 100_000
+    search_index_ttl: float = 300.0
+
     model_config = SettingsConfigDict(
         env_file=BASE_DIR + '/.env',
         env_file_encoding='utf-8',
-    )
\ No newline at end of file
+    )
+
+@lru_cache
+def get_settings() -> Settings:
+    """.env 는 처음 필요할 때 한 번만 읽는다."""
+    return Settings()
@@ -0,0 +1,48 @@
+# 앱마다 하나씩 만들어 모든 컨트롤러가 함께 쓰는 Jinja2 환경
+# 컴파일된 템플릿을 파일 바이트코드 캐시에 저장해 워커가 뜰 때마다 다시 파싱하지 않고,
+# 렌더링은 render_async 로 이벤트 루프를 오래 붙잡지 않게 한다.
+
+import hashlib
+import os
+import jinja2
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from settings import BASE_DIR, Settings
+from timing import timed_phase
+
+TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
+
+def _bytecode_cache(settings: Settings) -> jinja2.BytecodeCache | None:
+    if not settings.template_cache_dir:
+        return None
+    os.makedirs(settings.template_cache_dir, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(settings.template_cache_dir)
+
+def create_template_environment(settings: Settings) -> jinja2.Environment:
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        enable_async=True,
+        bytecode_cache=_bytecode_cache(settings),
+        # 템플릿 파일이 바뀌지 않는 운영 환경에서는 매 요청마다 mtime 을 확인할 필요가 없다.
+        auto_reload=settings.template_auto_reload,
+    )
+
+def template_fingerprint(environment: jinja2.Environment) -> str:
+    """모든 템플릿 소스의 해시. create_app 에서 app.state.template_fingerprint 로 둔다.
+    배포로 템플릿이 바뀌면 렌더링 결과를 담는 ETag 와 페이지 캐시 키도 바뀐다.
+    template_auto_reload 로 실행 중에 고친 템플릿은 재시작할 때까지 반영하지 않는다."""
+    digest = hashlib.sha256()
+    for name in sorted(environment.list_templates(extensions=["html"])):
+        source, _, _ = environment.loader.get_source(environment, name)
+        digest.update(name.encode() + b"\0" + source.encode() + b"\0")
+    return digest.hexdigest()[:16]
+
+def preload_templates(environment: jinja2.Environment):
+    for name in environment.list_templates(extensions=["html"]):
+        environment.get_template(name)
+
+async def render_template(request: Request, name: str, context: dict, status_code: int = 200, headers: dict | None = None) -> HTMLResponse:
+    with timed_phase("template"):
+        html = await request.app.state.templates.get_template(name).render_async(context)
+    return HTMLResponse(html, status_code=status_code, headers=headers)
@@ -0,0 +1,45 @@
+# 테스트 공통 설정
+# 앱 모듈은 import 할 때 Settings 를 읽으므로 환경변수를 먼저 정하고, DB 는 테스트마다 임시 SQLite 파일을 쓴다.
+
+import asyncio
+import os
+import sys
+import tempfile
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+os.environ["MYSQL_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='memo-tests-'), 'default.db')}"
+os.environ["SECRET_KEY"] = "test"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["DB_SCHEMA_STARTUP"] = "migrate"
+os.environ["TEMPLATE_CACHE_DIR"] = ""
+# 테스트끼리 같은 사용자 이름으로 여러 번 로그인한다.
+os.environ["LOGIN_USER_ATTEMPTS"] = "1000"
+os.environ["LOGIN_IP_ATTEMPTS"] = "1000"
+
+from settings import Settings
+
+def run(coro):
+    return asyncio.run(coro)
+
+def sqlite_url(path) -> str:
+    return f"sqlite+aiosqlite:///{path}"
+
+@pytest.fixture
+def settings(tmp_path) -> Settings:
+    return Settings(mysql_url=sqlite_url(tmp_path / "memo.db"))
+
+@pytest.fixture
+def client(settings):
+    from fastapi.testclient import TestClient
+    from main import create_app
+
+    with TestClient(create_app(settings)) as test_client:
+        yield test_client
+
+def login(client, username: str = "tester", password: str = "test-password"):
+    client.post("/signup/", json={"username": username, "email": f"{username}@example.com", "password": password})
+    response = client.post("/login/", json={"username": username, "password": password})
+    assert response.status_code == 200, response.text
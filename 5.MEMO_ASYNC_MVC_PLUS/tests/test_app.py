@@ -0,0 +1,60 @@
+from fastapi.testclient import TestClient
+from conftest import login
+from main import create_app
+
+def test_create_app_uses_given_settings(settings, tmp_path):
+    settings.test_env = "from settings"
+    app = create_app(settings)
+    assert app.state.database.settings is settings
+    with TestClient(app) as client:
+        assert client.get("/test").json() == {"test": "from settings"}
+        login(client)
+        memo = client.post("/memos/", json={"title": "t", "content": "c"}).json()
+        # 자동 저장 큐도 이 앱의 DB 에 쓴다.
+        assert client.put(f"/memos/{memo['id']}/autosave", json={"title": "autosaved"}).status_code == 202
+    other = create_app(settings.model_copy(update={"mysql_url": f"sqlite+aiosqlite:///{tmp_path / 'other.db'}"}))
+    with TestClient(other) as client:
+        login(client)
+        assert client.get("/memos/api").json()["items"] == []
+    with TestClient(create_app(settings)) as client:
+        login(client)
+        assert [item["title"] for item in client.get("/memos/api").json()["items"]] == ["autosaved"]
+
+def test_create_app_builds_services_from_given_settings(settings):
+    app = create_app(settings.model_copy(update={
+        "session_backend": "memory",
+        "login_ip_attempts": 2,
+        "memo_page_size": 1,
+        "memo_bulk_max": 1,
+        "memo_page_cache_bytes": 0,
+        "search_index_max_docs": 7,
+    }))
+    assert [middleware.cls.__name__ for middleware in app.user_middleware] == ["TimingMiddleware", "ServerSessionMiddleware"]
+    assert app.state.page_cache is None
+    assert app.state.search_index.max_docs == 7
+    with TestClient(app) as client:
+        login(client)
+        assert "session_id" in client.cookies
+        # 회원가입 뒤 로그인 한 번으로 IP 버킷 두 개 중 하나를 썼다.
+        assert client.post("/login/", json={"username": "tester", "password": "test-password"}).status_code == 200
+        assert client.post("/login/", json={"username": "tester", "password": "test-password"}).status_code == 429
+        assert client.post("/memos/bulk", json=[{"title": "a", "content": "c"}] * 2).status_code == 413
+        client.post("/memos/", json={"title": "a", "content": "c"})
+        client.post("/memos/", json={"title": "b", "content": "c"})
+        assert len(client.get("/memos/api").json()["items"]) == 1
+
+    # 다른 설정으로 만든 앱은 서비스를 함께 쓰지 않는다.
+    other = create_app(settings)
+    assert other.state.login_rate_limiter is not app.state.login_rate_limiter
+    assert other.state.session_store is None
+
+def test_internal_endpoints_require_token(settings):
+    paths = ["/internal/hashing", "/internal/pool", "/internal/autosave", "/metrics"]
+    with TestClient(create_app(settings)) as client:
+        # 토큰을 설정하지 않으면 없는 경로처럼 보인다.
+        assert [client.get(path).status_code for path in paths] == [404] * 4
+    with TestClient(create_app(settings.model_copy(update={"internal_endpoints_token": "monitoring"}))) as client:
+        assert [client.get(path).status_code for path in paths] == [401] * 4
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        headers = {"Authorization": "Bearer monitoring"}
+        assert [client.get(path, headers=headers).status_code for path in paths] == [200] * 4
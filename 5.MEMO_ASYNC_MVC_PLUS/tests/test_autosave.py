@@ -0,0 +1,143 @@
+# AutosaveQueue 의 합치기, 실패 시 재큐잉, 쓰는 도중의 stop/discard 동작. DB 대신 가짜 세션을 쓴다.
+# 마지막 테스트는 앱에서 flush 한 번의 UPDATE 수와 검색 색인 갱신을 본다.
+
+import asyncio
+import pytest
+from sqlalchemy import event
+from conftest import login, run
+from controller.autosave import AutosaveQueue
+
+class FakeSession:
+    """execute 에 넘어온 executemany 파라미터를 모으고, commit 에서 gate 가 열릴 때까지 기다린다."""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params=None):
+        if params is not None:
+            self.rows.extend(params)
+
+    async def commit(self):
+        self.owner.writing.set()
+        await self.owner.gate.wait()
+        if self.owner.fail:
+            raise RuntimeError("write failed")
+        self.owner.committed.append(sorted(self.rows, key=lambda row: row["_id"]))
+
+class FakeDatabase:
+    def __init__(self, fail: bool = False, blocked: bool = False):
+        self.fail = fail
+        self.committed = []
+        self.writing = asyncio.Event()
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    def __call__(self):
+        return FakeSession(self)
+
+def test_submit_coalesces_per_memo():
+    async def scenario():
+        database = FakeDatabase()
+        queue = AutosaveQueue(database)
+        queue.submit(1, 10, {"title": "a"})
+        queue.submit(1, 10, {"content": "b"})
+        queue.submit(1, 10, {"title": "c"})
+        queue.submit(1, 11, {"title": "other"})
+        await queue.flush()
+        return database.committed, queue.stats()
+
+    committed, stats = run(scenario())
+    assert committed == [[
+        {"_id": 10, "_user_id": 1, "content": "b", "content_text": "b", "title": "c"},
+        {"_id": 11, "_user_id": 1, "title": "other"},
+    ]]
+    assert stats == {"pending": 0, "accepted": 4, "flushed": 2}
+
+def test_failed_flush_merges_with_newer_edits():
+    async def scenario():
+        database = FakeDatabase(fail=True, blocked=True)
+        queue = AutosaveQueue(database)
+        queue.submit(1, 10, {"title": "old", "content": "kept"})
+        flush = asyncio.create_task(queue.flush())
+        await database.writing.wait()
+        queue.submit(1, 10, {"title": "new"})
+        database.gate.set()
+        with pytest.raises(RuntimeError):
+            await flush
+        return queue._pending
+
+    assert run(scenario()) == {(1, 10): {"title": "new", "content": "kept"}}
+
+def test_stop_during_write_finishes_the_batch():
+    async def scenario():
+        database = FakeDatabase(blocked=True)
+        queue = AutosaveQueue(database, flush_interval=60, max_batch=1)
+        queue.start()
+        queue.submit(1, 10, {"title": "saved"})
+        await database.writing.wait()
+        stop = asyncio.create_task(queue.stop())
+        await asyncio.sleep(0.01)
+        # 쓰기가 끝나기 전에는 stop 도 끝나지 않는다.
+        assert not stop.done()
+        database.gate.set()
+        await stop
+        return database.committed, queue.stats()
+
+    committed, stats = run(scenario())
+    assert committed == [[{"_id": 10, "_user_id": 1, "title": "saved"}]]
+    assert stats["pending"] == 0 and stats["flushed"] == 1
+
+def test_discard_waits_for_inflight_write_and_is_not_requeued():
+    async def scenario():
+        database = FakeDatabase(fail=True, blocked=True)
+        queue = AutosaveQueue(database)
+        queue.submit(1, 10, {"title": "stale"})
+        queue.submit(1, 11, {"title": "retry me"})
+        flush = asyncio.create_task(queue.flush())
+        await database.writing.wait()
+        discard = asyncio.create_task(queue.discard(1, 10))
+        await asyncio.sleep(0.01)
+        # 직접 수정은 진행 중인 자동 저장이 끝난 뒤에 실행되어야 한다.
+        assert not discard.done()
+        database.gate.set()
+        await discard
+        with pytest.raises(RuntimeError):
+            await flush
+        return queue._pending
+
+    assert run(scenario()) == {(1, 11): {"title": "retry me"}}
+
+def test_flush_updates_loaded_search_index_in_place(client):
+    login(client)
+    ids = [client.post("/memos/", json={"title": f"memo {i}", "content": "draft"}).json()["id"] for i in range(3)]
+    assert client.get("/memos/search", params={"q": "draft"}).json()["items"]
+    search_index = client.app.state.search_index
+    user_index = search_index._users[1]
+
+    statements = []
+    event.listen(client.app.state.database.engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper()))
+    for i in range(30):
+        client.put(f"/memos/{ids[0]}/autosave", json={"title": f"renamed {i}", "content": f"typed{i}"})
+        client.put(f"/memos/{ids[1]}/autosave", json={"content": f"typed{i}"})
+    # 남의 메모 id 는 UPDATE 에서 걸러지고 색인에도 들어가지 않는다.
+    client.put("/memos/999/autosave", json={"title": "intruder", "content": "intruder"})
+    client.portal.call(client.app.state.autosave_queue.flush)
+
+    # 60번의 자동 저장이 컬럼 조합별 UPDATE 두 번과 버전 UPDATE 한 번으로 합쳐진다.
+    # 제목만 빠진 메모 하나는 색인을 고치려고 DB 에서 한 번 다시 읽는다.
+    assert [kind for kind in statements if kind in ("UPDATE", "SELECT")] == ["UPDATE", "UPDATE", "UPDATE", "SELECT"]
+    assert search_index._users[1] is user_index
+    search = lambda q: [item["id"] for item in client.get("/memos/search", params={"q": q}).json()["items"]]
+    assert search("typed29") == [ids[0], ids[1]]
+    assert search("renamed") == [ids[0]]
+    assert search("draft") == [ids[2]]
+    assert search("intruder") == []
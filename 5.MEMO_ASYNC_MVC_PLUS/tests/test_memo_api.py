@@ -0,0 +1,65 @@
+from conftest import login, run
+from model.databases.mysql import Database
+from model.repositories import SQLMemoRepository
+
+def test_bulk_endpoints(client):
+    login(client)
+    created = client.post("/memos/bulk", json=[{"title": f"bulk {i}", "content": f"body {i}"} for i in range(3)]).json()["results"]
+    ids = [result["id"] for result in created]
+    assert [result["status"] for result in created] == ["created"] * 3
+
+    updated = client.put("/memos/bulk", json=[{"id": ids[0], "title": "renamed"}, {"id": ids[2] + 100, "title": "missing"}]).json()["results"]
+    assert [result["status"] for result in updated] == ["updated", "not_found"]
+
+    deleted = client.request("DELETE", "/memos/bulk", json={"ids": [ids[1], ids[2] + 100]}).json()["results"]
+    assert [result["status"] for result in deleted] == ["deleted", "not_found"]
+
+    items = client.get("/memos/api").json()["items"]
+    assert items == [{"id": ids[0], "title": "renamed"}, {"id": ids[2], "title": "bulk 2"}]
+
+def test_sql_only_endpoints_rejected_on_mongo(client, monkeypatch):
+    login(client)
+    monkeypatch.setattr(client.app.state.settings, "memo_backend", "mongo")
+    assert client.get("/memos/export").status_code == 501
+    assert client.get("/memos/search", params={"q": "memo"}).status_code == 501
+
+def test_list_etag_sees_other_workers(client, settings):
+    login(client)
+    etag = client.get("/memos/").headers["etag"]
+    assert client.get("/memos/", headers={"If-None-Match": etag}).status_code == 304
+
+    # 같은 DB 에 붙은 별도 Database 가 다른 워커 역할을 한다.
+    async def write_from_other_worker():
+        database = Database(settings)
+        async with database.session() as db:
+            await SQLMemoRepository(db).create(1, "from other worker", "c")
+        await database.dispose()
+    run(write_from_other_worker())
+
+    response = client.get("/memos/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "from other worker" in response.text
+
+def test_list_etag_and_page_cache_follow_templates(client):
+    login(client)
+    client.post("/memos/", json={"title": "memo", "content": "body"})
+    etag = client.get("/memos/").headers["etag"]
+    assert client.get("/memos/", headers={"If-None-Match": etag}).status_code == 304
+
+    # 템플릿이 바뀐 배포: 메모는 그대로여도 예전 ETag 와 캐시된 페이지를 쓰지 않는다.
+    client.app.state.template_fingerprint = "redeployed"
+    response = client.get("/memos/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(client.app.state.page_cache._data) == 2
+
+def test_template_fingerprint_tracks_sources():
+    import jinja2
+    from templating import template_fingerprint
+
+    def fingerprint(source):
+        return template_fingerprint(jinja2.Environment(loader=jinja2.DictLoader({"memos.html": source, "home.html": "home"})))
+
+    assert fingerprint("{{ memos }}") == fingerprint("{{ memos }}")
+    assert fingerprint("{{ memos }}") != fingerprint("{{ memos|length }}")
@@ -0,0 +1,175 @@
+# MemoRepository 공통 계약 테스트. 같은 테스트를 SQL(SQLite) 저장소와 Mongo(mongomock) 저장소에 돌린다.
+
+import contextlib
+import mongomock
+import pytest
+from sqlalchemy import insert
+from conftest import run
+from model.databases import migrations
+from model.databases.models import User
+from model.databases.mysql import Database
+from model.repositories import SQLMemoRepository
+from model.repositories.mongo import MongoMemoRepository
+
+OWNER, OTHER = 1, 2
+
+class AsyncCursor:
+    """mongomock 커서를 motor 커서처럼 async for 로 읽게 한다."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def __aiter__(self):
+        for document in self._cursor:
+            yield document
+
+class AsyncCollection:
+    """mongomock 컬렉션의 메서드를 motor 처럼 await 할 수 있게 감싼다."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def bulk_write(self, operations, ordered=True):
+        # mongomock 이 설치된 pymongo 의 UpdateOne 을 받지 못해 하나씩 적용한다.
+        for operation in operations:
+            self._collection.update_one(operation._filter, operation._doc)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+class AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._database[name])
+
+@contextlib.asynccontextmanager
+async def sql_repository(settings):
+    database = Database(settings)
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+        await conn.execute(insert(User), [
+            {"username": "owner", "email": "owner@example.com", "hashed_password": "x"},
+            {"username": "other", "email": "other@example.com", "hashed_password": "x"},
+        ])
+    try:
+        async with database.session() as db:
+            yield SQLMemoRepository(db)
+    finally:
+        await database.dispose()
+
+@contextlib.asynccontextmanager
+async def mongo_repository(settings):
+    repo = MongoMemoRepository(AsyncDatabase(mongomock.MongoClient()["memo_test"]))
+    await repo.ensure_indexes()
+    yield repo
+
+@pytest.fixture(params=["sql", "mongo"])
+def open_repository(request, settings):
+    factory = sql_repository if request.param == "sql" else mongo_repository
+    return lambda: factory(settings)
+
+def test_create_and_list_pages(open_repository):
+    async def scenario():
+        async with open_repository() as repo:
+            created = [await repo.create(OWNER, f"memo {i}", f"body {i}") for i in range(5)]
+            await repo.create(OTHER, "not mine", "hidden")
+            first, cursor = await repo.list_page(OWNER, None, 2, include_content=False)
+            second, last_cursor = await repo.list_page(OWNER, cursor, 10, include_content=True)
+            return created, first, cursor, second, last_cursor
+
+    created, first, cursor, second, last_cursor = run(scenario())
+    assert created[0] == {"id": created[0]["id"], "user_id": OWNER, "title": "memo 0", "content": "body 0"}
+    assert first == [{"id": memo["id"], "title": memo["title"]} for memo in created[:2]]
+    assert cursor == created[1]["id"]
+    assert second == [{"id": memo["id"], "title": memo["title"], "content": memo["content"]} for memo in created[2:]]
+    assert last_cursor is None
+
+def test_update_checks_ownership(open_repository):
+    async def scenario():
+        async with open_repository() as repo:
+            memo = await repo.create(OWNER, "title", "content")
+            return (
+                memo,
+                await repo.update(OWNER, memo["id"], None, "new content"),
+                await repo.update(OWNER, memo["id"], None, None),
+                await repo.update(OTHER, memo["id"], "stolen", None),
+                await repo.update(OWNER, memo["id"] + 100, "missing", None),
+            )
+
+    memo, partial, unchanged, foreign, missing = run(scenario())
+    assert partial == {"id": memo["id"], "user_id": OWNER, "title": "title", "content": "new content"}
+    assert unchanged == partial
+    assert foreign is None
+    assert missing is None
+
+def test_delete_checks_ownership(open_repository):
+    async def scenario():
+        async with open_repository() as repo:
+            memo = await repo.create(OWNER, "title", "content")
+            results = [
+                await repo.delete(OTHER, memo["id"]),
+                await repo.delete(OWNER, memo["id"]),
+                await repo.delete(OWNER, memo["id"]),
+            ]
+            page, _ = await repo.list_page(OWNER, None, 10, include_content=False)
+            return results, page
+
+    results, page = run(scenario())
+    assert results == [False, True, False]
+    assert page == []
+
+def test_content_chunks(open_repository):
+    body = "긴 본문 " * 50000
+
+    async def scenario():
+        async with open_repository() as repo:
+            memo = await repo.create(OWNER, "large", body)
+            chunks = await repo.content_chunks(OWNER, memo["id"])
+            streamed = b"".join([chunk async for chunk in chunks])
+            return streamed, await repo.content_chunks(OTHER, memo["id"])
+
+    streamed, foreign = run(scenario())
+    assert streamed.decode("utf-8") == body
+    assert foreign is None
+
+def test_bulk_operations(open_repository):
+    async def scenario():
+        async with open_repository() as repo:
+            ids = await repo.bulk_create(OWNER, [(f"bulk {i}", f"body {i}") for i in range(3)])
+            foreign = await repo.create(OTHER, "other", "other")
+            updated = await repo.bulk_update(OWNER, [
+                (ids[0], "renamed", None),
+                (ids[1], None, None),
+                (foreign["id"], "stolen", None),
+            ])
+            deleted = await repo.bulk_delete(OWNER, [ids[2], foreign["id"], ids[2] + 100])
+            page, _ = await repo.list_page(OWNER, None, 10, include_content=True)
+            untouched = await repo.update(OTHER, foreign["id"], None, None)
+            return ids, updated, deleted, page, untouched
+
+    ids, updated, deleted, page, untouched = run(scenario())
+    assert len(ids) == 3 and ids == sorted(ids)
+    assert updated == {ids[0], ids[1]}
+    assert deleted == {ids[2]}
+    assert page == [
+        {"id": ids[0], "title": "renamed", "content": "body 0"},
+        {"id": ids[1], "title": "bulk 1", "content": "body 1"},
+    ]
+    assert untouched["title"] == "other"
@@ -0,0 +1,121 @@
+# 메모 수정/삭제가 한 문장(+ 같은 트랜잭션의 버전 UPDATE)으로 끝나는지 DB 로 보내는 SQL 수를 센다.
+
+import sqlite3
+import pytest
+from sqlalchemy import event, insert, make_url
+from sqlalchemy.engine import CursorResult
+from conftest import run
+from model.databases import migrations
+from model.databases.models import User
+from model.databases.mysql import Database
+from model.repositories import SQLMemoRepository
+
+class StatementLog:
+    def __init__(self, engine):
+        self.statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("PRAGMA"):
+            self.statements.append(statement.split()[0].upper())
+
+    def take(self) -> list:
+        statements, self.statements = self.statements, []
+        return statements
+
+async def prepare(database):
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+        await conn.execute(insert(User).values(username="owner", email="owner@example.com", hashed_password="x"))
+        await conn.execute(insert(User).values(username="other", email="other@example.com", hashed_password="x"))
+
+@pytest.fixture
+def database(settings):
+    return Database(settings)
+
+def test_update_and_delete_are_single_statements(database):
+    async def scenario():
+        await prepare(database)
+        log = StatementLog(database.engine)
+        async with database.session() as db:
+            repo = SQLMemoRepository(db)
+            memo = await repo.create(1, "title", "content")
+            log.take()
+            updated = await repo.update(1, memo["id"], "new title", None)
+            counts = {"update": log.take()}
+            assert await repo.update(2, memo["id"], "stolen", None) is None
+            counts["update_foreign"] = log.take()
+            assert await repo.delete(2, memo["id"]) is False
+            counts["delete_foreign"] = log.take()
+            assert await repo.delete(1, memo["id"]) is True
+            counts["delete"] = log.take()
+        await database.dispose()
+        return updated, counts
+
+    updated, counts = run(scenario())
+    assert updated == {"id": 1, "user_id": 1, "title": "new title", "content": "content"}
+    # 다른 사용자의 메모면 버전을 올리지 않는다.
+    assert counts == {"update": ["UPDATE", "UPDATE"], "update_foreign": ["UPDATE"], "delete_foreign": ["DELETE"], "delete": ["DELETE", "UPDATE"]}
+
+def test_update_without_returning(database, monkeypatch, settings):
+    # MySQL 처럼 RETURNING 이 없는 경로. 일부 컬럼만 바꾸면 커밋 후 한 번 더 읽는다.
+    monkeypatch.setattr(database.engine.dialect, "update_returning", False)
+    path = make_url(settings.mysql_url).database
+
+    async def scenario():
+        await prepare(database)
+        log = StatementLog(database.engine)
+        async with database.session() as db:
+            repo = SQLMemoRepository(db)
+            memo = await repo.create(1, "title", "content")
+            log.take()
+            full = await repo.update(1, memo["id"], "both", "changed")
+            counts = {"full": log.take()}
+            partial = await repo.update(1, memo["id"], "partial", None)
+            counts["partial"] = log.take()
+
+            # 커밋과 다시 읽기 사이에 다른 커넥션이 메모를 지운 경우
+            def delete_before_select(conn, cursor, statement, *args):
+                if statement.lstrip().upper().startswith("SELECT"):
+                    with sqlite3.connect(path) as other:
+                        other.execute("DELETE FROM memo WHERE id = ?", (memo["id"],))
+            event.listen(database.engine.sync_engine, "before_cursor_execute", delete_before_select)
+            raced = await repo.update(1, memo["id"], "gone", None)
+        await database.dispose()
+        return full, partial, raced, counts
+
+    full, partial, raced, counts = run(scenario())
+    assert full["title"] == "both" and full["content"] == "changed"
+    assert partial == {"id": 1, "user_id": 1, "title": "partial", "content": "changed"}
+    assert raced is None
+    assert counts == {"full": ["UPDATE", "UPDATE"], "partial": ["UPDATE", "UPDATE", "SELECT"]}
+
+def test_bulk_create_returns_ids(database, monkeypatch):
+    async def scenario(returning: bool):
+        monkeypatch.setattr(database.engine.dialect, "insert_executemany_returning_sort_by_parameter_order", returning)
+        if not returning:
+            # SQLite 의 lastrowid 는 마지막 줄의 id 다. MySQL 의 LAST_INSERT_ID() 처럼 첫 줄의 id 를 돌려주게 한다.
+            lastrowid = CursorResult.lastrowid
+            monkeypatch.setattr(CursorResult, "lastrowid", property(lambda self: lastrowid.fget(self) - self.rowcount + 1))
+        log = StatementLog(database.engine)
+        async with database.session() as db:
+            repo = SQLMemoRepository(db)
+            ids = await repo.bulk_create(1, [(f"memo {i}", f"body {i}") for i in range(5)])
+            statements = log.take()
+            page, _ = await repo.list_page(1, ids[0] - 1, 10, include_content=False)
+        return ids, statements, page
+
+    async def both():
+        await prepare(database)
+        batched = await scenario(True)
+        # MySQL 처럼 RETURNING 이 없으면 여러 줄 INSERT 한 문장으로 넣는다.
+        multi_values = await scenario(False)
+        await database.dispose()
+        return batched, multi_values
+
+    batched, multi_values = run(both())
+    for ids, _, page in (batched, multi_values):
+        assert None not in ids
+        assert [row["id"] for row in page] == ids
+        assert [row["title"] for row in page] == [f"memo {i}" for i in range(5)]
+    assert multi_values[1] == ["INSERT", "UPDATE"]
@@ -0,0 +1,36 @@
+# 없는 사용자 로그인에 쓰는 더미 해시를 시작할 때와 calibrate 뒤에 만드는지
+
+from fastapi.testclient import TestClient
+from conftest import run
+from controller.dependencies import create_password_hasher
+from main import create_app
+
+def test_dummy_hash_is_ready_after_startup(settings):
+    app = create_app(settings)
+    hasher = app.state.password_hasher
+    assert hasher.dummy_hash is None
+    with TestClient(app) as client:
+        dummy = hasher.dummy_hash
+        assert dummy is not None
+        assert client.post("/login/", json={"username": "nobody", "password": "x" * 8}).status_code == 401
+        # 로그인 요청 중에 새로 만들지 않는다.
+        assert hasher.dummy_hash is dummy
+
+def test_calibrate_rebuilds_dummy_hash(settings):
+    hasher = create_password_hasher(settings.model_copy(update={"bcrypt_rounds": 5}))
+
+    async def calibrate():
+        await hasher.warm_up()
+        stale = hasher.dummy_hash
+        result = await hasher.calibrate(budget_ms=0)
+        # 다시 계산한 비용으로 해시하고 검증한다.
+        new_hash = await hasher.hash("password")
+        hasher.shutdown()
+        return stale, result, new_hash
+
+    stale, result, new_hash = run(calibrate())
+    assert result["rounds"] == 4
+    assert hasher.dummy_hash != stale
+    assert hasher.context.verify("anything", hasher.dummy_hash) is False
+    assert not hasher.context.needs_update(hasher.dummy_hash)
+    assert new_hash.startswith("$2b$04$")
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+from conftest import run
+from model.databases.mysql import Database
+from model.databases.pool import TimedAsyncQueuePool
+
+async def select_one(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+def test_pool_stats_survive_dispose(settings):
+    async def scenario():
+        database = Database(settings)
+        await select_one(database.engine)
+        # dispose() 는 풀을 recreate() 로 새로 만든다.
+        await database.dispose()
+        await select_one(database.engine)
+        pool = database.engine.sync_engine.pool
+        snapshot = database.pool_stats.snapshot(pool)
+        await database.dispose()
+        return pool, snapshot
+
+    pool, snapshot = run(scenario())
+    assert isinstance(pool, TimedAsyncQueuePool)
+    assert snapshot["checkouts"] == 2
+    assert snapshot["wait"]["count"] == 2
+    assert snapshot["connects"] == 2
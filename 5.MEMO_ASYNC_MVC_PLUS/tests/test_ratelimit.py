@@ -0,0 +1,90 @@
+# 로그인 시도 제한 token bucket (MemoryRateLimitStore, LoginRateLimiter)
+
+import pytest
+from fastapi import HTTPException
+from conftest import run
+from controller import ratelimit
+from controller.ratelimit import LoginRateLimiter, MemoryRateLimitStore
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+def test_rejects_when_empty_and_refills(clock):
+    store = MemoryRateLimitStore()
+
+    async def hits(count):
+        return [await store.hit("k", 3, 1.0) for _ in range(count)]
+
+    assert run(hits(3)) == [0.0, 0.0, 0.0]
+    assert run(hits(1)) == [1.0]
+    clock[0] += 0.5
+    assert run(hits(1)) == [pytest.approx(0.5)]
+    clock[0] += 0.5
+    assert run(hits(2)) == [0.0, pytest.approx(1.0)]
+    # 아무리 오래 기다려도 capacity 이상은 쌓이지 않는다.
+    clock[0] += 100
+    assert run(hits(4)) == [0.0, 0.0, 0.0, 1.0]
+
+def test_allowed_rate_matches_configuration(clock):
+    # 10초 동안 10ms 마다 시도하면 처음 capacity 개와 초당 refill 개만 허용된다.
+    store = MemoryRateLimitStore()
+    capacity, rate, seconds = 5, 2.0, 10
+
+    async def attempts():
+        allowed = 0
+        for _ in range(seconds * 100):
+            if not await store.hit("k", capacity, rate):
+                allowed += 1
+            clock[0] += 0.01
+        return allowed
+
+    assert abs(run(attempts()) - (capacity + rate * seconds)) <= 1
+
+def test_prunes_full_buckets(clock):
+    store = MemoryRateLimitStore(shards=1, max_keys_per_shard=10)
+
+    async def fill():
+        for i in range(10):
+            await store.hit(f"old{i}", 3, 1.0)
+        clock[0] += 10
+        await store.hit("new", 3, 1.0)
+
+    run(fill())
+    assert list(store._shards[0][0]) == ["new"]
+
+def test_caps_keys_per_shard_lru(clock):
+    store = MemoryRateLimitStore(shards=1, max_keys_per_shard=10)
+    buckets = store._shards[0][0]
+
+    async def flood():
+        # 가득 찬 버킷이 없어도 키 수가 한도를 넘지 않고, 계속 쓰는 키는 남는다.
+        for i in range(1000):
+            await store.hit(f"flood{i}", 3, 0.001)
+            await store.hit("hot", 3, 0.001)
+            assert len(buckets) <= 10
+
+    run(flood())
+    assert list(buckets) == [f"flood{i}" for i in range(991, 1000)] + ["hot"]
+    assert buckets["hot"][0] < 1
+
+def test_login_limiter_sets_retry_after(clock):
+    limiter = LoginRateLimiter(MemoryRateLimitStore(), user_attempts=2, user_window=60, ip_attempts=100, ip_window=60)
+
+    async def attempt(username, ip="1.2.3.4"):
+        try:
+            await limiter.check(username, ip)
+        except HTTPException as exc:
+            return exc.status_code, exc.headers["Retry-After"]
+        return 200, None
+
+    assert run(attempt("alice")) == (200, None)
+    assert run(attempt("alice")) == (200, None)
+    # 계정 버킷은 2개/60초라 토큰 하나가 차는 데 30초 걸린다.
+    assert run(attempt("alice")) == (429, "30")
+    assert run(attempt("bob")) == (200, None)
+    clock[0] += 29.5
+    assert run(attempt("alice")) == (429, "1")
+    assert limiter.rejected == 2
@@ -0,0 +1,70 @@
+# primary 와 replica 로 SQLite 파일 두 개를 쓴다. 둘 사이에 복제는 없으므로 replica 는 항상 뒤처진 상태다.
+
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from conftest import login, run, sqlite_url
+from main import create_app
+from model.databases import migrations
+from model.databases.models import User
+from model.databases.mysql import Database
+
+@pytest.fixture
+def replica_settings(settings, tmp_path):
+    replica_url = sqlite_url(tmp_path / "replica.db")
+    replica_settings = settings.model_copy(update={
+        "replica_urls": [replica_url],
+        "replica_read_after_write": 0.5,
+        "internal_endpoints_token": "monitoring",
+    })
+
+    async def prepare():
+        # replica 에도 스키마와 같은 사용자를 만들어 둔다.
+        replica = Database(settings.model_copy(update={"mysql_url": replica_url}))
+        async with replica.engine.begin() as conn:
+            await conn.run_sync(migrations.upgrade)
+            await conn.execute(insert(User).values(username="tester", email="tester@example.com", hashed_password="x"))
+        await replica.dispose()
+
+    run(prepare())
+    return replica_settings
+
+def test_reads_follow_last_write(replica_settings):
+    with TestClient(create_app(replica_settings)) as client:
+        login(client)
+        memo = client.post("/memos/", json={"title": "on primary", "content": "body"}).json()
+
+        # 방금 쓴 세션은 primary 에서 읽는다.
+        assert [item["id"] for item in client.get("/memos/api").json()["items"]] == [memo["id"]]
+        assert client.get("/memos/search", params={"q": "primary"}).json()["items"]
+        assert client.get("/memos/export").text.strip()
+
+        # read-after-write 시간이 지나면 replica 로 간다.
+        time.sleep(replica_settings.replica_read_after_write + 0.1)
+        assert client.get("/memos/api").json()["items"] == []
+        assert client.get("/memos/").status_code == 200
+        assert client.get("/memos/export").text == ""
+
+        pool = client.get("/internal/pool", headers={"Authorization": "Bearer monitoring"}).json()
+        assert pool["replicas"][0]["checkouts"] > 0
+        assert pool["replicas"][0]["checked_out"] == 0
+
+def test_read_session_factory_routing(replica_settings):
+    database = Database(replica_settings)
+    assert not database.sqlite_reader
+    assert database.read_session_factory(use_primary=True) is database.session_factory
+    assert database.read_session_factory() is database.replica_session_factories[0]
+
+    same_file = Database(replica_settings.model_copy(update={"replica_urls": []}))
+    # 같은 파일을 읽는 SQLite 읽기 풀은 복제 지연이 없어 방금 쓴 세션도 보낸다.
+    assert same_file.sqlite_reader
+    assert same_file.read_session_factory(use_primary=True) is same_file.replica_session_factories[0]
+
+def test_last_write_only_recorded_with_replicas(settings, replica_settings):
+    for configured, recorded in ((settings, False), (replica_settings, True)):
+        with TestClient(create_app(configured.model_copy(update={"session_backend": "memory"}))) as client:
+            login(client)
+            client.post("/memos/", json={"title": "memo", "content": "body"})
+            sessions = [data for data, _ in client.app.state.session_store._data.values()]
+            assert ["last_write" in data for data in sessions] == [recorded]
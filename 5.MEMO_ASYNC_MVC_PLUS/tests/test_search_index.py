@@ -0,0 +1,121 @@
+# InvertedSearchIndex 의 크기 제한(LRU)과 TTL 재구성
+
+from sqlalchemy import insert
+from conftest import run
+from model import search
+from model.databases import migrations
+from model.databases.models import Memo, User
+from model.databases.mysql import Database
+from model.search import InvertedSearchIndex
+
+async def seed(database, memos_per_user: dict):
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+        for user_id, count in memos_per_user.items():
+            await conn.execute(insert(User).values(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com", hashed_password="x"))
+            await conn.execute(insert(Memo), [{"user_id": user_id, "title": f"apple {i}", "content": "banana"} for i in range(count)])
+
+def test_evicts_least_recently_searched_users(settings):
+    index = InvertedSearchIndex(max_docs=5, ttl=60)
+
+    async def scenario():
+        database = Database(settings)
+        await seed(database, {1: 2, 2: 2, 3: 2})
+        async with database.session() as db:
+            for user_id in (1, 2):
+                await index.search(db, user_id, "apple", 0, 10)
+            # 1 을 다시 검색해 가장 최근으로 만든 뒤 3 을 올리면 2 가 밀려난다.
+            await index.search(db, 1, "apple", 0, 10)
+            hits = await index.search(db, 3, "apple", 0, 10)
+        await database.dispose()
+        return hits
+
+    hits = run(scenario())
+    assert len(hits) == 2
+    assert list(index._users) == [1, 3]
+    assert index.docs == 4
+
+    index.add(1, 100, "cherry", None)
+    index.add(1, 101, "cherry", None)
+    assert list(index._users) == [1]
+    assert index.docs == 4
+    index.remove(1, 100)
+    assert index.docs == 3
+
+def test_rebuilds_after_ttl(settings, monkeypatch):
+    index = InvertedSearchIndex(ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(search.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        database = Database(settings)
+        await seed(database, {1: 1})
+        async with database.session() as db:
+            before = await index.search(db, 1, "apple", 0, 10)
+            # 다른 워커가 추가한 메모라 이 인덱스에는 증분 갱신되지 않았다.
+            await db.execute(insert(Memo).values(user_id=1, title="apple late", content=""))
+            await db.commit()
+            cached = await index.search(db, 1, "apple", 0, 10)
+            now[0] += 11
+            rebuilt = await index.search(db, 1, "apple", 0, 10)
+        await database.dispose()
+        return before, cached, rebuilt
+
+    before, cached, rebuilt = run(scenario())
+    assert len(before) == len(cached) == 1
+    assert len(rebuilt) == 2
+    assert index.docs == 2
+
+def test_content_text_follows_every_write_path(settings):
+    # fulltext 백엔드가 읽는 content_text 가 본문과 같은지. 긴 본문은 SEARCH_TEXT_CHARS 까지만 남는다.
+    from sqlalchemy import select
+    from controller.autosave import AutosaveQueue
+    from model.databases.types import SEARCH_TEXT_CHARS
+    from model.repositories import SQLMemoRepository
+
+    long_body = "x" * (SEARCH_TEXT_CHARS + 100)
+
+    async def scenario():
+        database = Database(settings)
+        await seed(database, {1: 1})
+        async with database.session() as db:
+            repo = SQLMemoRepository(db)
+            created = await repo.create(1, "t", "created body")
+            updated = await repo.create(1, "t", "old")
+            await repo.update(1, updated["id"], None, "updated body")
+            bulk = await repo.bulk_create(1, [("t", "bulk body"), ("t", long_body)])
+            await repo.bulk_update(1, [(bulk[0], None, "bulk updated body")])
+        queue = AutosaveQueue(database.session_factory)
+        queue.submit(1, created["id"], {"content": "autosaved body"})
+        await queue.flush()
+        async with database.session() as db:
+            rows = (await db.execute(select(Memo.id, Memo.content, Memo.content_text).order_by(Memo.id))).all()
+            hits = await InvertedSearchIndex().search(db, 1, "autosaved", 0, 10)
+        await database.dispose()
+        return rows, hits, created["id"]
+
+    rows, hits, created_id = run(scenario())
+    # seed 가 넣은 메모도 INSERT 기본값으로 채워진다.
+    assert [(content, text) for _, content, text in rows][:-1] == [
+        ("banana", "banana"), ("autosaved body", "autosaved body"), ("updated body", "updated body"),
+        ("bulk updated body", "bulk updated body"),
+    ]
+    _, content, text = rows[-1]
+    assert content == long_body and text == long_body[:SEARCH_TEXT_CHARS]
+    assert [hit["id"] for hit in hits] == [created_id]
+
+def test_migration_backfills_content_text(settings):
+    from sqlalchemy import text
+
+    async def scenario():
+        database = Database(settings)
+        async with database.engine.begin() as conn:
+            await conn.run_sync(migrations.upgrade, 5)
+            await conn.execute(insert(User).values(id=1, username="user1", email="user1@example.com", hashed_password="x"))
+            await conn.execute(text("INSERT INTO memo (user_id, title, content) VALUES (1, 'old', 'old body')"))
+            await conn.run_sync(migrations.upgrade)
+            rows = (await conn.execute(text("SELECT content_text FROM memo"))).all()
+        await database.dispose()
+        return rows
+
+    assert run(scenario()) == [("old body",)]
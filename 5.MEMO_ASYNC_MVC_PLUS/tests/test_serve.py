@@ -0,0 +1,77 @@
+# serve.py 를 SQLite 로 띄워 요청을 보내고 SIGTERM 으로 정상 종료되는지, 자동 저장 큐가 비워지는지 본다.
+
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import httpx
+import pytest
+from serve import check_workers
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_ready(base_url: str, process, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"serve.py 가 종료되었습니다: {process.returncode}")
+        try:
+            httpx.get(base_url + "/test", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise TimeoutError(base_url)
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM")
+def test_sqlite_serve_shuts_down_gracefully(tmp_path):
+    path = tmp_path / "serve.db"
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, MYSQL_URL=f"sqlite+aiosqlite:///{path}", AUTOSAVE_FLUSH_INTERVAL="600")
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env,
+    )
+    try:
+        wait_ready(base_url, process)
+        with httpx.Client(base_url=base_url) as client:
+            client.post("/signup/", json={"username": "serve", "email": "serve@example.com", "password": "serve-password"})
+            assert client.post("/login/", json={"username": "serve", "password": "serve-password"}).status_code == 200
+            memo = client.post("/memos/", json={"title": "before", "content": "c"}).json()
+            assert client.get("/memos/api").json()["items"] == [{"id": memo["id"], "title": "before"}]
+            # flush 주기가 길어 종료할 때에만 DB 에 쓰인다.
+            assert client.put(f"/memos/{memo['id']}/autosave", json={"title": "autosaved"}).status_code == 202
+        process.send_signal(signal.SIGTERM)
+        # uvicorn 은 정상 종료를 마친 뒤 받은 신호를 다시 보내므로 -SIGTERM 으로 끝날 수 있다.
+        assert process.wait(timeout=30) in (0, -signal.SIGTERM)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT title FROM memo").fetchall() == [("autosaved",)]
+
+def test_check_workers(settings):
+    assert check_workers(settings.model_copy(update={"session_backend": "memory"}), 1) == ([], [])
+    errors, warnings = check_workers(settings.model_copy(update={"session_backend": "memory"}), 4)
+    assert len(errors) == 1 and "SESSION_BACKEND" in errors[0]
+    shared = settings.model_copy(update={
+        "mysql_url": "mysql+aiomysql://user:pw@localhost/memo",
+        "session_backend": "redis",
+        "search_backend": "fulltext",
+        "memo_page_cache_bytes": 0,
+        "login_rate_limit_backend": "redis",
+    })
+    assert check_workers(shared, 4) == ([], [])
+    # 기본값(SQLite, 메모리 역색인/페이지 캐시/로그인 제한)은 경고만 한다.
+    errors, warnings = check_workers(settings, 4)
+    assert errors == [] and len(warnings) == 4
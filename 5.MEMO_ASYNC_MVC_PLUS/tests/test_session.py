@@ -0,0 +1,92 @@
+# 서버 사이드 세션: 로그인/로그아웃 때 세션 id 교체, 폐기된 id 가 되살아나지 않는지
+
+import fakeredis
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from conftest import run
+import session
+from session import MemorySessionStore, RedisSessionStore, ServerSessionMiddleware, rotate_session
+
+def memory_store():
+    return MemorySessionStore(ttl=60)
+
+def redis_store():
+    return RedisSessionStore(fakeredis.FakeAsyncRedis(), ttl=60)
+
+@pytest.mark.parametrize("make_store", [memory_store, redis_store])
+def test_deleted_session_is_not_restored(make_store):
+    async def scenario():
+        store = make_store()
+        await store.set("a", {"username": "alice"})
+        await store.set("b", {"username": "alice"})
+        await store.set("c", {"username": "bob"})
+        await store.delete("a")
+        await store.revoke_user("alice")
+        # 폐기 전에 시작해 늦게 끝난 요청이 예전 데이터를 다시 저장하려는 경우
+        await store.set("a", {"username": "alice"})
+        await store.set("b", {"username": "alice"})
+        return [await store.get(session_id) for session_id in ("a", "b", "c")]
+
+    assert run(scenario()) == [None, None, {"username": "bob"}]
+
+def test_memory_revocations_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session.time, "monotonic", lambda: now[0])
+    store = memory_store()
+
+    async def scenario():
+        await store.delete("old")
+        now[0] += 61
+        await store.delete("new")
+        await store.set("old", {"n": 1})
+        return await store.get("old")
+
+    assert run(scenario()) == {"n": 1}
+    assert list(store._revoked) == ["new"]
+
+@pytest.fixture
+def session_client():
+    app = FastAPI()
+    store = memory_store()
+
+    @app.post("/cart")
+    async def cart(request: Request):
+        request.session["cart"] = "apple"
+
+    @app.post("/login")
+    async def login(request: Request):
+        rotate_session(request)
+        request.session["username"] = "alice"
+
+    @app.post("/logout")
+    async def logout(request: Request):
+        rotate_session(request)
+        request.session.pop("username", None)
+
+    @app.get("/whoami")
+    async def whoami(request: Request):
+        return dict(request.session)
+
+    app.add_middleware(ServerSessionMiddleware, store=store)
+    with TestClient(app) as client:
+        yield client, store
+
+def test_login_and_logout_rotate_session_id(session_client):
+    client, store = session_client
+    client.post("/cart")
+    anonymous = client.cookies["session_id"]
+
+    client.post("/login")
+    logged_in = client.cookies["session_id"]
+    assert logged_in != anonymous
+    assert client.get("/whoami").json() == {"cart": "apple", "username": "alice"}
+    assert run(store.get(anonymous)) is None
+
+    client.post("/logout")
+    assert client.cookies["session_id"] not in (anonymous, logged_in)
+    assert client.get("/whoami").json() == {"cart": "apple"}
+    assert run(store.get(logged_in)) is None
+    # 빼앗긴 예전 쿠키로는 로그인 상태가 되지 않는다.
+    client.cookies.set("session_id", logged_in)
+    assert client.get("/whoami").json() == {}
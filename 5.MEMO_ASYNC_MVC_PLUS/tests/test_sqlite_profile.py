@@ -0,0 +1,41 @@
+from sqlalchemy import text
+from conftest import login, run
+from model.databases.mysql import Database
+
+def test_sqlite_connections_use_wal_and_pragmas(settings):
+    async def pragmas(engine):
+        async with engine.connect() as conn:
+            return {
+                name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in ("journal_mode", "synchronous", "query_only", "busy_timeout")
+            }
+
+    async def scenario():
+        database = Database(settings)
+        try:
+            return await pragmas(database.engine), await pragmas(database.replica_engines[0])
+        finally:
+            await database.dispose()
+
+    writer, reader = run(scenario())
+    assert writer == {"journal_mode": "wal", "synchronous": 1, "query_only": 0, "busy_timeout": settings.sqlite_busy_timeout_ms}
+    assert reader["journal_mode"] == "wal"
+    assert reader["query_only"] == 1
+
+def test_sqlite_read_paths(client, settings):
+    login(client)
+    memo = client.post("/memos/", json={"title": "hello sqlite", "content": "body"}).json()
+
+    # 읽기 풀보다 많이 요청해도 커넥션이 반납되어야 한다.
+    for _ in range(settings.sqlite_read_pool_size * 2):
+        assert client.get("/memos/api").status_code == 200
+    assert client.get("/memos/").status_code == 200
+    assert client.get("/memos/api").json()["items"][0]["id"] == memo["id"]
+    assert client.get("/memos/search", params={"q": "sqlite"}).json()["items"][0]["id"] == memo["id"]
+    assert client.get("/memos/export").text.strip()
+    assert client.get(f"/memos/{memo['id']}/content").text == "body"
+
+    pool = client.app.state.database.pool_snapshot()
+    assert pool["size"] == 1
+    assert pool["replicas"][0]["checkouts"] >= settings.sqlite_read_pool_size * 2
+    assert pool["replicas"][0]["checked_out"] == 0
@@ -0,0 +1,41 @@
+# Server-Timing 헤더와 /metrics 의 라우트 라벨, 단계(db, hash, template) 기록
+
+from conftest import login
+
+def server_timing(response) -> dict:
+    phases = {}
+    for entry in response.headers["server-timing"].split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+def test_server_timing_phases(client):
+    client.post("/signup/", json={"username": "timing", "email": "timing@example.com", "password": "timing-password"})
+    response = client.post("/login/", json={"username": "timing", "password": "timing-password"})
+    assert {"db", "hash", "total"} <= set(server_timing(response))
+
+    memo = client.post("/memos/", json={"title": "t", "content": "c"}).json()
+    response = client.get("/memos/")
+    assert {"db", "template", "total"} <= set(server_timing(response))
+    assert client.get(f"/memos/{memo['id']}/content").status_code == 200
+
+def test_metrics_use_full_route_template(client):
+    login(client)
+    memo = client.post("/memos/", json={"title": "t", "content": "c"}).json()
+    client.get("/memos/")
+    client.get("/")
+    client.get(f"/memos/{memo['id']}/content")
+    client.put(f"/memos/{memo['id']}", json={"title": "renamed"})
+    client.get("/no-such-page")
+
+    client.app.state.settings.internal_endpoints_token = "monitoring"
+    metrics = client.get("/metrics", headers={"Authorization": "Bearer monitoring"}).text
+    assert 'method="GET",route="/memos/",phase="template"' in metrics
+    assert 'method="GET",route="/",phase="template"' in metrics
+    assert 'method="GET",route="/memos/{memo_id}/content",phase="total"' in metrics
+    assert 'method="PUT",route="/memos/{memo_id}",phase="db"' in metrics
+    assert 'method="POST",route="/login/",phase="hash"' in metrics
+    assert 'method="GET",route="unmatched",phase="total"' in metrics
+    # 홈과 메모 목록의 template 단계가 따로 집계된다.
+    assert metrics.count('route="/",phase="template",le="+Inf"} 1') == 1
+    assert metrics.count('route="/memos/",phase="template",le="+Inf"} 1') == 1
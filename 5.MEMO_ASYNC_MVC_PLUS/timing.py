@@ -0,0 +1,127 @@
+# 요청 단계별 시간 측정 (DB, 비밀번호 해싱, 템플릿 렌더링)
+# Server-Timing 헤더로 내보내고 /metrics 에서 Prometheus 형식 히스토그램으로 보여준다.
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_phases: ContextVar[dict | None] = ContextVar("request_phases", default=None)
+
+def record_phase(name: str, seconds: float):
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+@contextmanager
+def timed_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+def instrument_engine(engine):
+    """AsyncEngine 의 커서 실행 시간을 db 단계로 기록한다."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_phase("db", time.perf_counter() - conn.info["query_start"].pop())
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+
+class RequestMetrics:
+    def __init__(self):
+        self.histograms: dict[tuple, Histogram] = {}
+
+    def observe(self, method: str, route: str, phase: str, seconds: float):
+        key = (method, route, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def render(self) -> str:
+        name = "memo_request_phase_seconds"
+        lines = [
+            f"# HELP {name} Request duration by route and phase.",
+            f"# TYPE {name} histogram",
+        ]
+        for (method, route, phase), histogram in sorted(self.histograms.items()):
+            labels = f'method="{method}",route="{route}",phase="{phase}"'
+            for bound, count in zip(BUCKETS, histogram.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def route_label(scope) -> str:
+    """매칭된 라우트의 전체 경로 템플릿(예: /memos/{memo_id}).
+    include_router 의 prefix 가 route.path 에 들어 있지 않은 FastAPI 버전도 있어서, 실제 경로에서
+    라우트가 매칭한 뒷부분을 뺀 나머지를 prefix 로 붙인다."""
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", route.path)
+    path = scope["path"].removeprefix(scope.get("root_path", ""))
+    try:
+        matched = template.format_map({name: str(value) for name, value in scope.get("path_params", {}).items()})
+    except (KeyError, ValueError):
+        return template
+    if not path.endswith(matched):
+        return template
+    return path[:len(path) - len(matched)] + template
+
+class TimingMiddleware:
+    """요청별 단계 시간을 모아 Server-Timing 헤더를 붙이고 RequestMetrics 에 기록한다."""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases = {}
+        token = _phases.set(phases)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - start
+                headers = MutableHeaders(scope=message)
+                entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items()]
+                entries.append(f"total;dur={total * 1000:.2f}")
+                headers.append("Server-Timing", ", ".join(entries))
+
+                path = route_label(scope)
+                for name, seconds in phases.items():
+                    self.metrics.observe(scope["method"], path, name, seconds)
+                self.metrics.observe(scope["method"], path, "total", total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _phases.reset(token)
@@ -0,0 +1,112 @@
+# 메모 일괄 처리 처리량 비교: 단건 요청 N 번과 /memos/bulk 요청
+#
+# 5.MEMO_ASYNC_MVC_PLUS 를 로컬 SQLite 로 띄우고 같은 수의 메모를 단건 API 와 일괄 API 로 각각
+# 생성/수정/삭제해 초당 처리한 메모 수를 비교한다.
+#
+# 사용법: python benchmarks/bulk_memos.py [--memos 1000] [--batch 500] [--concurrency 10]
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from run import LAUNCHER, ROOT, free_port, wait_ready
+
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+
+async def login(client: httpx.AsyncClient, username: str):
+    password = "benchmark-password"
+    await client.post("/signup/", json={"username": username, "email": f"{username}@example.com", "password": password})
+    response = await client.post("/login/", json={"username": username, "password": password})
+    response.raise_for_status()
+
+async def timed(name: str, count: int, run) -> dict:
+    start = time.perf_counter()
+    await run()
+    elapsed = time.perf_counter() - start
+    return {"name": name, "memos": count, "elapsed_s": elapsed, "memos_per_s": count / elapsed}
+
+async def single_calls(client, memos: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    ids = []
+
+    async def call(request):
+        async with semaphore:
+            response = await request()
+            response.raise_for_status()
+            return response
+
+    async def create():
+        responses = await asyncio.gather(*(
+            call(lambda i=i: client.post("/memos/", json={"title": f"memo {i}", "content": "benchmark " * 20}))
+            for i in range(memos)
+        ))
+        ids.extend(response.json()["id"] for response in responses)
+
+    async def update():
+        await asyncio.gather(*(call(lambda memo_id=memo_id: client.put(f"/memos/{memo_id}", json={"title": "updated"})) for memo_id in ids))
+
+    async def delete():
+        await asyncio.gather(*(call(lambda memo_id=memo_id: client.delete(f"/memos/{memo_id}")) for memo_id in ids))
+
+    return [
+        await timed("create (single)", memos, create),
+        await timed("update (single)", memos, update),
+        await timed("delete (single)", memos, delete),
+    ]
+
+async def bulk_calls(client, memos: int, batch: int) -> list:
+    ids = []
+    batches = [range(start, min(start + batch, memos)) for start in range(0, memos, batch)]
+
+    async def create():
+        for indexes in batches:
+            response = await client.post("/memos/bulk", json=[{"title": f"memo {i}", "content": "benchmark " * 20} for i in indexes])
+            response.raise_for_status()
+            ids.extend(result["id"] for result in response.json()["results"])
+
+    async def update():
+        for start in range(0, len(ids), batch):
+            response = await client.put("/memos/bulk", json=[{"id": memo_id, "title": "updated"} for memo_id in ids[start:start + batch]])
+            response.raise_for_status()
+
+    async def delete():
+        for start in range(0, len(ids), batch):
+            response = await client.request("DELETE", "/memos/bulk", json={"ids": ids[start:start + batch]})
+            response.raise_for_status()
+
+    return [
+        await timed("create (bulk)", memos, create),
+        await timed("update (bulk)", memos, update),
+        await timed("delete (bulk)", memos, delete),
+    ]
+
+async def main():
+    parser = argparse.ArgumentParser(description="메모 일괄 처리 처리량 비교")
+    parser.add_argument("--memos", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10, help="단건 요청 동시 실행 수")
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        process = subprocess.Popen([sys.executable, LAUNCHER, APP_DIR, "main:application", os.path.join(tmp, "bulk.db"), str(port)])
+        try:
+            await wait_ready(base_url, process)
+            async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+                await login(client, f"bulk{int(time.time())}")
+                results = await single_calls(client, args.memos, args.concurrency)
+                results += await bulk_calls(client, args.memos, args.batch)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    for result in results:
+        print(f"{result['name']:16s} {result['memos_per_s']:9.1f} memos/s  ({result['elapsed_s']:.2f}s)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
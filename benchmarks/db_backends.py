@@ -0,0 +1,173 @@
+# 5.MEMO_ASYNC_MVC_PLUS 의 메모 저장소 백엔드(SQLite, MySQL, MongoDB)별 메모 CRUD 성능 비교
+#
+# HTTP 없이 SQLMemoRepository / MongoMemoRepository 를 직접 호출해 생성, 목록, 수정, 삭제를 동시에 보내고
+# 연산별 처리량과 p50/p95/p99 지연 시간, "database is locked" 같은 오류 수를 JSON 으로 출력한다.
+# MySQL URL 은 비어 있는 벤치마크 전용 DB 를 가리켜야 한다(마이그레이션을 적용하고 데이터를 남긴다).
+# MongoDB 는 --mongo-url 로 mongod 를 주거나 --mongomock 으로 메모리 안의 mongomock-motor 를 쓴다.
+# mongomock 은 네트워크와 저장 비용이 없으므로 저장소 코드의 오버헤드만 보여 준다. 실행마다 새 DB 이름을 쓴다.
+#
+# 사용법: python benchmarks/db_backends.py --url mysql+aiomysql://user:pw@localhost/memo_bench \
+#             [--mongo-url mongodb://localhost:27017] [--mongomock] \
+#             [--concurrency 20] [--operations 200] [--output db_backends.json]
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+OPERATIONS = ("create", "list", "update", "delete")
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+async def run_workload(repository, user_ids: list, operations: int) -> dict:
+    """repository(write) 는 저장소를 내주고 write 면 끝에 커밋하는 async context manager 다."""
+    latencies = {name: [] for name in OPERATIONS}
+    errors = {name: 0 for name in OPERATIONS}
+
+    async def timed(name, write, run):
+        start = time.perf_counter()
+        try:
+            async with repository(write) as repo:
+                value = await run(repo)
+        except Exception:
+            errors[name] += 1
+            return None
+        latencies[name].append((time.perf_counter() - start) * 1000)
+        return value
+
+    async def worker(user_id: int):
+        for i in range(operations):
+            memo = await timed("create", True, lambda repo: repo.create(user_id, f"memo {i}", "content " * 40))
+            await timed("list", False, lambda repo: repo.list_page(user_id, None, 20, include_content=False))
+            if memo is None:
+                continue
+            await timed("update", True, lambda repo: repo.update(user_id, memo["id"], f"updated {i}", None))
+            # 절반만 지워서 목록 조회가 빈 테이블을 읽지 않게 한다.
+            if i % 2:
+                await timed("delete", True, lambda repo: repo.delete(user_id, memo["id"]))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(user_id) for user_id in user_ids))
+    elapsed = time.perf_counter() - start
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "elapsed_s": elapsed,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "operations": {name: summarize(latencies[name], errors[name], elapsed) for name in OPERATIONS},
+    }
+
+async def run_sql(url: str, concurrency: int, operations: int) -> dict:
+    from sqlalchemy import insert, select
+    from model.databases import migrations
+    from model.databases.models import User
+    from model.databases.mysql import Database
+    from model.repositories import SQLMemoRepository
+    from settings import Settings
+
+    database = Database(Settings(mysql_url=url))
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+
+    # 같은 DB 에서 여러 번 돌려도 겹치지 않도록 실행마다 사용자 이름을 바꾼다.
+    prefix = f"bench{int(time.time())}_"
+    async with database.session() as db:
+        await db.execute(insert(User), [
+            {"username": f"{prefix}{i}", "email": f"{prefix}{i}@example.com", "hashed_password": "x"}
+            for i in range(concurrency)
+        ])
+        await db.commit()
+        result = await db.execute(select(User.id).where(User.username.startswith(prefix)))
+        user_ids = [row[0] for row in result]
+
+    @asynccontextmanager
+    async def repository(write):
+        factory = database.session_factory if write else database.read_session_factory()
+        async with factory() as db:
+            yield SQLMemoRepository(db)
+            if write:
+                await db.commit()
+
+    result = await run_workload(repository, user_ids, operations)
+    pool = database.pool_stats.snapshot(database.engine.sync_engine.pool)
+    await database.dispose()
+    return {"url": database.engine.url.render_as_string(hide_password=True), **result, "write_pool_wait": pool["wait"]}
+
+async def run_mongo(url: str, concurrency: int, operations: int) -> dict:
+    from model.repositories.mongo import MongoMemoRepository
+
+    if url == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(url)
+    name = f"memo_bench_{int(time.time())}"
+    # 앱처럼 요청마다 저장소를 새로 만들되 클라이언트(커넥션 풀)는 공유한다.
+    database = client[name]
+    await MongoMemoRepository(database).ensure_indexes()
+
+    @asynccontextmanager
+    async def repository(write):
+        yield MongoMemoRepository(database)
+
+    result = await run_workload(repository, list(range(1, concurrency + 1)), operations)
+    client.close()
+    return {"url": url if url == "mongomock" else f"mongodb://.../{name}", **result}
+
+async def main():
+    parser = argparse.ArgumentParser(description="DB 백엔드별 메모 CRUD 성능 비교")
+    parser.add_argument("--url", action="append", default=[], help="비교할 DB URL (여러 번 지정 가능)")
+    parser.add_argument("--mongo-url", action="append", default=[], help="비교할 MongoDB URL (여러 번 지정 가능)")
+    parser.add_argument("--mongomock", action="store_true", help="mongomock-motor 로 Mongo 저장소를 잰다")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    urls = [f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'bench.db')}", *args.url]
+    os.environ.setdefault("MYSQL_URL", urls[0])
+    os.environ.setdefault("SECRET_KEY", "db-backends")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    runs = [(run_sql, url) for url in urls] + [(run_mongo, url) for url in args.mongo_url]
+    if args.mongomock:
+        runs.append((run_mongo, "mongomock"))
+    results = []
+    for run, url in runs:
+        print(f"측정: {url.split('://')[0]}")
+        result = await run(url, args.concurrency, args.operations)
+        for name, summary in result["operations"].items():
+            print(f"  {name:7s} {summary['throughput']:8.1f}/s  p50 {summary['p50_ms']:.2f}ms  "
+                  f"p99 {summary['p99_ms']:.2f}ms  오류 {summary['errors']}")
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+# 메모 내보내기 메모리(RSS)와 처리량: 스트리밍(/memos/export) vs 한 번에 .all()
+#
+# SQLite 에 메모를 넣은 뒤, 방식마다 새 프로세스를 띄워 NDJSON 으로 모두 직렬화한다.
+#   - stream: controller.memos.stream_memo_rows (서버 사이드 커서, chunk 단위)
+#   - all: 예전처럼 결과를 .all() 로 모두 읽은 뒤 직렬화
+# 내보내기 전후의 최대 RSS(VmHWM) 증가량과 초당 메모 수를 출력한다. 리눅스에서만 RSS 를 잰다.
+# SQLite 의 mmap(기본 256MB)과 페이지 캐시(기본 64MB)도 RSS 에 잡혀 스트리밍의 증가량을 가리므로
+# 기본으로 둘 다 작게 줄인다. 앱 설정 그대로 재려면 --app-sqlite-settings 를 준다.
+#
+# 사용법: python benchmarks/export_memory.py [--memos 100000] [--content-bytes 500] [--app-sqlite-settings]
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+
+def read_rss_kb() -> dict:
+    memory = {}
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+def setup_app(db_path: str):
+    os.environ["MYSQL_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "export-memory")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+async def seed(db_path: str, memos: int, content_bytes: int):
+    setup_app(db_path)
+    from sqlalchemy import insert
+    from model.databases import migrations
+    from model.databases.models import Memo, User
+    from model.databases.mysql import get_database
+
+    database = get_database()
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+        await conn.execute(insert(User).values(username="export", email="export@example.com", hashed_password="x"))
+        body = ("export benchmark " * (content_bytes // 17 + 1))[:content_bytes]
+        for start in range(0, memos, 10000):
+            await conn.execute(insert(Memo), [
+                {"user_id": 1, "title": f"memo {i}", "content": body} for i in range(start, min(start + 10000, memos))
+            ])
+    await database.dispose()
+
+async def export(db_path: str, mode: str) -> dict:
+    setup_app(db_path)
+    from sqlalchemy import select
+    from controller.memos import stream_memo_rows
+    from model.databases.models import Memo
+    from model.databases.mysql import get_database
+
+    database = get_database()
+    # 엔진과 커넥션을 먼저 열어 두어 그 비용이 증가량에 섞이지 않게 한다.
+    async with database.session() as db:
+        await db.execute(select(Memo.id).limit(1))
+    before = read_rss_kb()
+    written = 0
+    rows = 0
+    start = time.perf_counter()
+    if mode == "stream":
+        async for chunk in stream_memo_rows(database.session_factory, 1, "ndjson", database.settings.memo_export_chunk_size):
+            written += len(chunk.encode())
+            rows += chunk.count("\n")
+    else:
+        async with database.session() as db:
+            result = await db.execute(select(Memo.id, Memo.title, Memo.content).where(Memo.user_id == 1).order_by(Memo.id))
+            body = "".join(json.dumps(dict(row), ensure_ascii=False) + "\n" for row in result.mappings().all())
+        written = len(body.encode())
+        rows = body.count("\n")
+    elapsed = time.perf_counter() - start
+    after = read_rss_kb()
+    await database.dispose()
+    return {
+        "mode": mode,
+        "rows": rows,
+        "bytes": written,
+        "elapsed_s": elapsed,
+        "rows_per_s": rows / elapsed if elapsed else 0.0,
+        "rss_growth_kb": after.get("VmHWM", 0) - before.get("VmHWM", 0),
+        "peak_rss_kb": after.get("VmHWM", 0),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="메모 내보내기 메모리와 처리량 비교")
+    parser.add_argument("--memos", type=int, default=100_000)
+    parser.add_argument("--content-bytes", type=int, default=500)
+    parser.add_argument("--app-sqlite-settings", action="store_true", help="SQLite mmap/페이지 캐시를 줄이지 않음")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, db_path = args.child
+        print(json.dumps(asyncio.run(export(db_path, mode))))
+        return
+
+    if not args.app_sqlite_settings:
+        os.environ.setdefault("SQLITE_MMAP_SIZE", "0")
+        os.environ.setdefault("SQLITE_CACHE_SIZE_KB", "2000")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "export.db")
+        subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); "
+                        f"import asyncio, export_memory; asyncio.run(export_memory.seed({db_path!r}, {args.memos}, {args.content_bytes}))"],
+                       check=True)
+        print(f"메모 {args.memos}개, 본문 {args.content_bytes}바이트")
+        for mode in ("all", "stream"):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, db_path],
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"  {mode:6s} {result['rows_per_s']:9.0f} memos/s  {result['bytes'] / 1024 / 1024:6.1f}MB  "
+                  f"최대 RSS 증가 {result['rss_growth_kb'] / 1024:6.1f}MB (최대 {result['peak_rss_kb'] / 1024:.1f}MB)")
+
+if __name__ == "__main__":
+    main()
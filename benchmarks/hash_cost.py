@@ -0,0 +1,44 @@
+# 비밀번호 해시 비용별 소요 시간 측정
+# 5.MEMO_ASYNC_MVC_PLUS 의 bcrypt_rounds / argon2_time_cost / password_hash_budget_ms 를 정할 때 참고한다.
+#
+# 사용법: python benchmarks/hash_cost.py [--repeat 3]
+
+import argparse
+import statistics
+import time
+from passlib.context import CryptContext
+
+CANDIDATES = {
+    "bcrypt": ("rounds", range(8, 15)),
+    "argon2": ("time_cost", range(1, 7)),
+}
+
+def measure(handler, repeat: int) -> tuple:
+    hash_times, verify_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hashed = handler.hash("benchmark-password")
+        hash_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        handler.verify("benchmark-password", hashed)
+        verify_times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(hash_times), statistics.median(verify_times)
+
+def main():
+    parser = argparse.ArgumentParser(description="비밀번호 해시 비용 측정")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for scheme, (name, values) in CANDIDATES.items():
+        try:
+            handler = CryptContext(schemes=[scheme]).handler(scheme)
+            handler.hash("probe")
+        except Exception as error:
+            print(f"{scheme}: 건너뜀 ({error})")
+            continue
+        for value in values:
+            hash_ms, verify_ms = measure(handler.using(**{name: value}), args.repeat)
+            print(f"{scheme} {name}={value}: hash {hash_ms:.1f}ms, verify {verify_ms:.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# 5.MEMO_ASYNC_MVC_PLUS 모듈의 import 시간 측정 (python -X importtime)
+#
+# 모듈마다 새 인터프리터에서 import 해 누적 시간(us)의 중앙값을 잰다. 이미 설치된 라이브러리 import 비용까지 포함한다.
+# 다른 커밋과 비교하려면 git worktree 로 꺼낸 폴더를 --app-dir 로 준다.
+#
+# 사용법: python benchmarks/import_time.py [--app-dir 5.MEMO_ASYNC_MVC_PLUS] [--repeat 5]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["settings", "model.databases", "model.repositories", "controller", "main"]
+
+def import_time_us(app_dir: str, module: str, env: dict) -> int | None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=app_dir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return None
+    # "import time: self [us] | cumulative | imported package" 에서 요청한 모듈 줄을 찾는다.
+    for line in reversed(result.stderr.splitlines()):
+        parts = [part.strip() for part in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import 시간 측정")
+    parser.add_argument("--app-dir", default=os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    env = dict(os.environ)
+    env.setdefault("MYSQL_URL", f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'import.db')}")
+    env.setdefault("SECRET_KEY", "import-time")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    for module in MODULES:
+        samples = [import_time_us(args.app_dir, module, env) for _ in range(args.repeat)]
+        if None in samples:
+            print(f"{module:20s} import 실패")
+            continue
+        print(f"{module:20s} {statistics.median(samples) / 1000:8.1f}ms")
+
+if __name__ == "__main__":
+    main()
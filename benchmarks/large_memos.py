@@ -0,0 +1,122 @@
+# 100 KB 메모의 저장 크기와 목록 조회 지연 시간
+#
+# 같은 본문을 두 SQLite 파일에 넣어 비교한다.
+#   - 예전 방식: 본문을 TEXT 로 그대로 저장하고, 목록 조회가 본문까지 읽는다.
+#   - 지금 방식: 5 버전 스키마(압축 BLOB, deferred, 검색용 본문 앞부분 사본 포함). 목록은 id/title 만 읽고 본문은 /memos/{id}/content 로 따로 읽는다.
+# DB 파일 크기, 목록 한 페이지 조회 p50/p99, 본문 하나를 압축 해제하며 읽는 시간을 출력한다.
+#
+# 사용법: python benchmarks/large_memos.py [--memos 500] [--size-kb 100] [--lists 200]
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+WORDS = "메모 회의 일정 정리 프로젝트 배포 서버 데이터베이스 the quick brown fox jumps over lazy dog 2024 release note".split()
+
+def make_body(size: int, rng: random.Random) -> str:
+    # 실제 메모처럼 단어가 반복되는 본문. 완전히 무작위인 바이트보다 잘 압축된다.
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word.encode()) + 1
+    return " ".join(words)
+
+def file_size(path: str) -> int:
+    return sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix))
+
+async def timed(runs: int, call) -> dict:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {"p50_ms": latencies[len(latencies) // 2], "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]}
+
+async def main():
+    parser = argparse.ArgumentParser(description="큰 메모의 저장 크기와 목록 조회 지연 시간")
+    parser.add_argument("--memos", type=int, default=500)
+    parser.add_argument("--size-kb", type=int, default=100)
+    parser.add_argument("--lists", type=int, default=200, help="목록 조회 반복 횟수")
+    parser.add_argument("--page", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    current_path = os.path.join(tmp.name, "current.db")
+    plain_path = os.path.join(tmp.name, "plain.db")
+    os.environ["MYSQL_URL"] = f"sqlite+aiosqlite:///{current_path}"
+    os.environ.setdefault("SECRET_KEY", "large-memos")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    from sqlalchemy import Column, Integer, MetaData, String, Table, Text, insert, select, text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from model.databases import migrations
+    from model.databases.models import User
+    from model.databases.mysql import get_database
+    from model.repositories import SQLMemoRepository
+
+    rng = random.Random(0)
+    bodies = [make_body(args.size_kb * 1024, rng) for _ in range(args.memos)]
+    raw_bytes = sum(len(body.encode()) for body in bodies)
+
+    # 지금 방식
+    database = get_database()
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+        await conn.execute(insert(User).values(username="large", email="large@example.com", hashed_password="x"))
+    async with database.session() as db:
+        await SQLMemoRepository(db).bulk_create(1, [(f"memo {i}", body) for i, body in enumerate(bodies)])
+
+    # 예전 방식: 압축 없는 TEXT
+    plain_engine = create_async_engine(f"sqlite+aiosqlite:///{plain_path}")
+    plain = Table("memo", MetaData(), Column("id", Integer, primary_key=True), Column("user_id", Integer, index=True),
+                  Column("title", String(100)), Column("content", Text))
+    async with plain_engine.begin() as conn:
+        await conn.run_sync(plain.metadata.create_all)
+        await conn.execute(insert(plain), [{"user_id": 1, "title": f"memo {i}", "content": body} for i, body in enumerate(bodies)])
+
+    for engine in (database.engine, plain_engine):
+        async with engine.connect() as conn:
+            await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+    async def list_current():
+        async with database.session() as db:
+            await SQLMemoRepository(db).list_page(1, None, args.page, include_content=False)
+
+    async def list_plain():
+        async with plain_engine.connect() as conn:
+            result = await conn.execute(select(plain).where(plain.c.user_id == 1).order_by(plain.c.id).limit(args.page))
+            result.all()
+
+    async def read_content():
+        async with database.session() as db:
+            chunks = await SQLMemoRepository(db).content_chunks(1, args.memos // 2)
+            async for _ in chunks:
+                pass
+
+    results = {
+        "예전 방식 목록 (본문 포함)": await timed(args.lists, list_plain),
+        "지금 방식 목록 (id, title)": await timed(args.lists, list_current),
+        "지금 방식 본문 하나 스트리밍": await timed(args.lists, read_content),
+    }
+    current_size, plain_size = file_size(current_path), file_size(plain_path)
+    await database.dispose()
+    await plain_engine.dispose()
+
+    print(f"메모 {args.memos}개 x {args.size_kb}KB, 원본 {raw_bytes / 1024 / 1024:.1f}MB")
+    print(f"  DB 크기: 예전 방식 {plain_size / 1024 / 1024:.1f}MB, 지금 방식 {current_size / 1024 / 1024:.1f}MB "
+          f"({current_size / plain_size:.0%})")
+    for name, result in results.items():
+        print(f"  {name:28s} p50 {result['p50_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
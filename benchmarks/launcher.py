@@ -0,0 +1,105 @@
+# 벤치마크용 앱 실행기
+# 각 버전의 코드는 그대로 두고, 엔진 생성 함수를 가로채 DB URL 만 로컬 SQLite 로 바꾼다.
+# 풀 크기, echo 같은 나머지 인자는 그 버전이 준 그대로 둔다. SQLite 잠금을 기다리는 시간은 길게 준다.
+# 5 버전은 MYSQL_URL 로 SQLite 를 직접 지원하므로 가로채지 않는다.
+#
+# 예전 버전이 지금 설치된 라이브러리와 맞지 않는 부분은 여기서 맞춘다(shim). 앱 코드는 고치지 않는다.
+#   - TemplateResponse(name, context): 지금 Starlette 는 TemplateResponse(request, name, context) 만 받는다.
+#   - 3, 4 버전은 async 인 get_password_hash/verify_password 를 await 없이 부른다. 회원가입이 코루틴을 저장하려다
+#     실패하고 로그인은 bcrypt 검증 없이 통과하므로, 다른 버전과 같은 비용의 동기 함수로 바꾼다.
+#     4 버전은 verify_password(hash, password) 순서로 부르므로 해시인 쪽을 찾아 검증한다.
+#
+# 사용법: python launcher.py <앱 폴더> <모듈:변수> <sqlite 파일> <포트>
+
+import os
+import sys
+
+NATIVE_SQLITE = {"5.MEMO_ASYNC_MVC_PLUS"}
+# await 없이 부르는 비밀번호 함수가 있는 모듈
+SYNC_PASSWORD_SHIMS = {
+    "3.MEMO_ASYNC_MVC": "dependencies",
+    "4.MEMO_ASYNC_MVC_PLUS": "controller.dependencies",
+}
+# SQLite 잠금을 기다리는 시간(초). 동시 쓰기에서 나는 "database is locked" 가 앱의 오류로 잡히지 않게 한다.
+SQLITE_BUSY_TIMEOUT = 30
+
+def patch_engines(db_path: str):
+    import sqlalchemy
+    import sqlalchemy.ext.asyncio
+
+    create_engine = sqlalchemy.create_engine
+    create_async_engine = sqlalchemy.ext.asyncio.create_async_engine
+
+    def sqlite_engine(url, **kwargs):
+        # 동기 버전은 스레드풀에서 커넥션을 쓰므로 같은 스레드 검사를 끈다.
+        kwargs["connect_args"] = {**kwargs.get("connect_args", {}), "check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT}
+        return create_engine(f"sqlite:///{db_path}", **kwargs)
+
+    def sqlite_async_engine(url, **kwargs):
+        kwargs["connect_args"] = {**kwargs.get("connect_args", {}), "timeout": SQLITE_BUSY_TIMEOUT}
+        return create_async_engine(f"sqlite+aiosqlite:///{db_path}", **kwargs)
+
+    sqlalchemy.create_engine = sqlite_engine
+    sqlalchemy.ext.asyncio.create_async_engine = sqlite_async_engine
+
+def patch_template_response():
+    from starlette.templating import Jinja2Templates
+
+    template_response = Jinja2Templates.TemplateResponse
+
+    def compatible(self, *args, **kwargs):
+        if args and isinstance(args[0], str):
+            name, context, *rest = args
+            return template_response(self, context["request"], name, context, *rest, **kwargs)
+        return template_response(self, *args, **kwargs)
+
+    Jinja2Templates.TemplateResponse = compatible
+
+def patch_password_functions(module_name: str):
+    import importlib
+
+    dependencies = importlib.import_module(module_name)
+    pwd_context = dependencies.pwd_context
+
+    def get_password_hash(password):
+        return pwd_context.hash(password)
+
+    def verify_password(plain_password, hashed_password):
+        if pwd_context.identify(plain_password) and not pwd_context.identify(hashed_password):
+            plain_password, hashed_password = hashed_password, plain_password
+        return pwd_context.verify(plain_password, hashed_password)
+
+    dependencies.get_password_hash = get_password_hash
+    dependencies.verify_password = verify_password
+
+def main():
+    app_dir, target, db_path, port = sys.argv[1:5]
+    app_dir = os.path.abspath(app_dir)
+    os.chdir(app_dir)
+    sys.path.insert(0, app_dir)
+
+    # 4, 5 버전의 Settings 는 환경변수에서 필수 값을 읽는다. 5 버전은 이 URL 로 SQLite 를 연다.
+    os.environ["MYSQL_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    # 5 버전은 기본적으로 스키마 버전만 확인하므로 빈 DB 에 마이그레이션을 적용하게 한다.
+    os.environ.setdefault("DB_SCHEMA_STARTUP", "migrate")
+    # 부하 생성기는 한 IP 에서 여러 사용자로 로그인하므로 5 버전의 로그인 시도 제한에 걸리지 않게 한다.
+    os.environ.setdefault("LOGIN_USER_ATTEMPTS", "1000000")
+    os.environ.setdefault("LOGIN_IP_ATTEMPTS", "1000000")
+
+    version = os.path.basename(app_dir)
+    if version not in NATIVE_SQLITE:
+        patch_engines(db_path)
+    patch_template_response()
+    if version in SYNC_PASSWORD_SHIMS:
+        # 컨트롤러가 이름을 import 하기 전에 바꿔야 한다.
+        patch_password_functions(SYNC_PASSWORD_SHIMS[version])
+
+    import uvicorn
+
+    module_name, attr = target.split(":")
+    module = __import__(module_name)
+    uvicorn.run(getattr(module, attr), host="127.0.0.1", port=int(port), log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# 로그인 부하가 있을 때 /memos/ 지연 시간
+#
+# 5 버전을 로컬 SQLite 로 띄우고, 로그인한 사용자가 /memos/ 를 계속 읽는 동안 다른 사용자들이 로그인을 반복한다.
+# 로그인 없이 읽기만 할 때와 로그인과 함께 읽을 때의 /memos/ p50/p99 를 해싱 방식별로 비교한다.
+#   - inline: 예전 방식처럼 bcrypt 를 이벤트 루프에서 바로 실행한다 (PasswordHasher._run 을 바꿔서 흉내 냄)
+#   - thread, process: PasswordHasher 의 워커 풀 (HASH_EXECUTOR)
+#
+# 사용법: python benchmarks/login_load.py [--seconds 5] [--readers 4] [--logins 8] [--rounds 12] [--modes inline thread process]
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from run import LAUNCHER, ROOT, free_port, percentile, wait_ready
+
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+BENCHMARKS = os.path.dirname(LAUNCHER)
+
+DRIVER = f"""
+import os, sys
+sys.path.insert(0, {BENCHMARKS!r})
+if os.environ.get("BENCH_INLINE_HASH"):
+    sys.path.insert(0, {APP_DIR!r})
+    os.chdir({APP_DIR!r})
+    from controller import dependencies
+
+    async def inline(self, func, *args):
+        return func(*args)
+    dependencies.PasswordHasher._run = inline
+import launcher
+launcher.main()
+"""
+
+PASSWORD = "login-load-password"
+
+async def signup_and_login(client: httpx.AsyncClient, username: str):
+    await client.post("/signup/", json={"username": username, "email": f"{username}@example.com", "password": PASSWORD})
+    response = await client.post("/login/", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+
+async def read_memos(base_url: str, cookies, seconds: float, latencies: list):
+    async with httpx.AsyncClient(base_url=base_url, cookies=cookies, timeout=60) as client:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = await client.get("/memos/")
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+async def login_loop(base_url: str, username: str, stop: asyncio.Event, count: list):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        while not stop.is_set():
+            response = await client.post("/login/", json={"username": username, "password": PASSWORD})
+            response.raise_for_status()
+            count[0] += 1
+
+async def measure(base_url: str, cookies, args, login_users: list) -> dict:
+    latencies = []
+    stop = asyncio.Event()
+    logins = [0]
+    tasks = [asyncio.create_task(login_loop(base_url, username, stop, logins)) for username in login_users]
+    await asyncio.gather(*(read_memos(base_url, cookies, args.seconds, latencies) for _ in range(args.readers)))
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "logins_per_s": logins[0] / args.seconds,
+    }
+
+async def bench_mode(mode: str, args) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    tmp = tempfile.TemporaryDirectory()
+    db_path = os.path.join(tmp.name, "login.db")
+    # inline 모드는 launcher 보다 먼저 앱 모듈을 import 하므로 launcher 가 채우는 값도 여기서 준다.
+    env = dict(
+        os.environ,
+        MYSQL_URL=f"sqlite+aiosqlite:///{db_path}",
+        SECRET_KEY="login-load",
+        DB_SCHEMA_STARTUP="migrate",
+        BCRYPT_ROUNDS=str(args.rounds),
+        HASH_EXECUTOR="thread" if mode == "inline" else mode,
+        LOGIN_USER_ATTEMPTS="1000000",
+        LOGIN_IP_ATTEMPTS="1000000",
+    )
+    if mode == "inline":
+        env["BENCH_INLINE_HASH"] = "1"
+    with tmp:
+        process = subprocess.Popen([sys.executable, "-c", DRIVER, APP_DIR, "main:application", db_path, str(port)], env=env)
+        try:
+            await wait_ready(base_url, process)
+            async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                await signup_and_login(client, "reader")
+                await client.post("/memos/bulk", json=[{"title": f"memo {i}", "content": "login load"} for i in range(50)])
+                cookies = client.cookies
+            login_users = [f"login{i}" for i in range(args.logins)]
+            async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                for username in login_users:
+                    await client.post("/signup/", json={"username": username, "email": f"{username}@example.com", "password": PASSWORD})
+            idle = await measure(base_url, cookies, args, [])
+            loaded = await measure(base_url, cookies, args, login_users)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return {"mode": mode, "idle": idle, "loaded": loaded}
+
+async def main():
+    parser = argparse.ArgumentParser(description="로그인 부하 중 /memos/ 지연 시간")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4, help="/memos/ 를 읽는 동시 요청 수")
+    parser.add_argument("--logins", type=int, default=8, help="로그인을 반복하는 동시 사용자 수")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt rounds")
+    parser.add_argument("--modes", nargs="*", default=["inline", "thread", "process"], choices=["inline", "thread", "process"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        result = await bench_mode(mode, args)
+        idle, loaded = result["idle"], result["loaded"]
+        print(f"[{mode:7s}] /memos/ 로그인 없음 p50 {idle['p50_ms']:7.1f}ms p99 {idle['p99_ms']:7.1f}ms | "
+              f"로그인 중 p50 {loaded['p50_ms']:7.1f}ms p99 {loaded['p99_ms']:7.1f}ms | 로그인 {loaded['logins_per_s']:.1f}/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
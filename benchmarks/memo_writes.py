@@ -0,0 +1,117 @@
+# 메모 수정/삭제 지연 시간 비교: 예전 방식(조회 -> ORM 수정 -> commit -> refresh)과 한 문장 UPDATE/DELETE
+#
+# 두 방식 모두 같은 DB 에서 메모를 하나씩 수정하고 삭제하며, 요청 하나의 지연 시간과 SQL 수를 잰다.
+#
+# 사용법: python benchmarks/memo_writes.py [--memos 2000] [--url mysql+aiomysql://...]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+
+async def load_modify_update(db, user_id, memo_id, title):
+    from sqlalchemy import select
+    from model.databases.models import Memo
+
+    result = await db.execute(select(Memo).where(Memo.user_id == user_id, Memo.id == memo_id))
+    memo = result.scalars().first()
+    if memo is None:
+        return None
+    memo.title = title
+    await db.commit()
+    await db.refresh(memo)
+    return memo
+
+async def load_modify_delete(db, user_id, memo_id):
+    from sqlalchemy import select
+    from model.databases.models import Memo
+
+    result = await db.execute(select(Memo).where(Memo.user_id == user_id, Memo.id == memo_id))
+    memo = result.scalars().first()
+    if memo is None:
+        return False
+    await db.delete(memo)
+    await db.commit()
+    return True
+
+async def measure(database, name, ids, run, statements) -> dict:
+    latencies = []
+    statements.clear()
+    for memo_id in ids:
+        async with database.session() as db:
+            start = time.perf_counter()
+            await run(db, memo_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "name": name,
+        "count": len(latencies),
+        "statements_per_call": len(statements) / len(latencies),
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="메모 수정/삭제 지연 시간 비교")
+    parser.add_argument("--url", help="DB URL (기본: 임시 SQLite 파일)")
+    parser.add_argument("--memos", type=int, default=2000)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["MYSQL_URL"] = args.url or f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'writes.db')}"
+    os.environ.setdefault("SECRET_KEY", "memo-writes")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    from sqlalchemy import event, insert, select
+    from model.databases import migrations
+    from model.databases.models import Memo, User
+    from model.databases.mysql import get_database
+    from model.repositories import SQLMemoRepository
+
+    database = get_database()
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+        username = f"writes{int(time.time())}"
+        await conn.execute(insert(User).values(username=username, email=f"{username}@example.com", hashed_password="x"))
+        user_id = (await conn.execute(select(User.id).where(User.username == username))).scalar()
+        await conn.execute(insert(Memo), [
+            {"user_id": user_id, "title": f"memo {i}", "content": "content " * 20} for i in range(args.memos)
+        ])
+        ids = (await conn.execute(select(Memo.id).where(Memo.user_id == user_id).order_by(Memo.id))).scalars().all()
+
+    statements = []
+
+    @event.listens_for(database.engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("PRAGMA"):
+            statements.append(statement)
+
+    half = len(ids) // 2
+    old_ids, new_ids = ids[:half], ids[half:]
+    results = [
+        await measure(database, "update (load-modify-refresh)", old_ids,
+                      lambda db, memo_id: load_modify_update(db, user_id, memo_id, "updated"), statements),
+        await measure(database, "update (single statement)", new_ids,
+                      lambda db, memo_id: SQLMemoRepository(db).update(user_id, memo_id, "updated", None), statements),
+        await measure(database, "delete (load-delete)", old_ids,
+                      lambda db, memo_id: load_modify_delete(db, user_id, memo_id), statements),
+        await measure(database, "delete (single statement)", new_ids,
+                      lambda db, memo_id: SQLMemoRepository(db).delete(user_id, memo_id), statements),
+    ]
+    await database.dispose()
+
+    print(f"{database.engine.dialect.name}, 메모 {len(ids)}개")
+    for result in results:
+        print(f"  {result['name']:30s} SQL {result['statements_per_call']:.1f}개  "
+              f"mean {result['mean_ms']:.2f}ms  p50 {result['p50_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
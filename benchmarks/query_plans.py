@@ -0,0 +1,140 @@
+# 5.MEMO_ASYNC_MVC_PLUS 메모 쿼리의 실행 계획 검사와 지연 시간 측정
+#
+# 시드 데이터를 넣은 로컬 DB 에서 컨트롤러/저장소가 실제로 보내는 SQL 을 가로채 EXPLAIN 하고,
+# 풀 스캔이 하나라도 있으면 0 이 아닌 코드로 끝난다.
+#
+# 사용법: python benchmarks/query_plans.py --memos 1000000 [--url mysql+aiomysql://...]
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+
+def is_full_scan(dialect: str, plan: list) -> bool:
+    if dialect == "sqlite":
+        # (id, parent, notused, detail). 인덱스 없이 "SCAN memo" 만 있으면 풀 스캔이다.
+        return any(row[3].startswith("SCAN ") and "INDEX" not in row[3] for row in plan)
+    return any(row._mapping.get("type") == "ALL" for row in plan)
+
+async def seed(engine, users: int, memos: int, batch: int = 10000):
+    from sqlalchemy import insert
+    from model.databases.models import Memo, User
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(users)
+        ])
+        for start in range(0, memos, batch):
+            rows = [
+                {"user_id": i % users + 1, "title": f"memo {i}", "content": "content " * 20}
+                for i in range(start, min(start + batch, memos))
+            ]
+            await conn.execute(insert(Memo), rows)
+
+async def main():
+    parser = argparse.ArgumentParser(description="메모 쿼리 실행 계획 검사")
+    parser.add_argument("--url", help="DB URL (기본: 임시 SQLite 파일)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--memos", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    url = args.url or f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'plans.db')}"
+    os.environ["MYSQL_URL"] = url
+    os.environ.setdefault("SECRET_KEY", "query-plans")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    from sqlalchemy import event, select
+    from model.databases import migrations
+    from model.databases.models import User
+    from model.databases.mysql import get_database
+    from model.repositories import SQLMemoRepository
+    from controller.memos import memo_export_query
+
+    database = get_database()
+    engine = database.engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+    print(f"시드 데이터 입력: 사용자 {args.users}명, 메모 {args.memos}개")
+    await seed(engine, args.users, args.memos)
+
+    captured = {}
+    current = [None]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if current[0] is not None and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.setdefault(current[0], []).append((statement, parameters))
+
+    user_id = 1
+    async with database.session() as db:
+        repo = SQLMemoRepository(db)
+        first_page, cursor = await repo.list_page(user_id, None, 20, include_content=False)
+        memo_id = first_page[0]["id"]
+
+        async def export():
+            result = await db.stream(memo_export_query(user_id, 500))
+            async for _ in result.partitions(500):
+                break
+            await result.close()
+
+        cases = {
+            "current_user": lambda: db.execute(select(User.id).where(User.username == "user0")),
+            "list_page": lambda: repo.list_page(user_id, None, 20, include_content=False),
+            "list_page_cursor": lambda: repo.list_page(user_id, cursor, 20, include_content=True),
+            "owned_memo_ids": lambda: repo.owned_ids(user_id, [row["id"] for row in first_page]),
+            "export": export,
+            "update": lambda: repo.update(user_id, memo_id, "updated", None),
+        }
+
+        timings = {}
+        for name, run in cases.items():
+            current[0] = name
+            await run()
+            current[0] = None
+            if name == "update":
+                continue
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                await run()
+            timings[name] = (time.perf_counter() - start) * 1000 / args.repeat
+
+        current[0] = "delete"
+        await repo.delete(user_id, memo_id)
+        current[0] = None
+
+    dialect = engine.dialect.name
+    explain = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    failures = []
+    async with engine.connect() as conn:
+        for name, statements in captured.items():
+            for statement, parameters in statements:
+                plan = await conn.exec_driver_sql(explain + statement, parameters)
+                plan = plan.all()
+                full_scan = is_full_scan(dialect, plan)
+                mark = "FULL SCAN" if full_scan else "ok"
+                timing = f"{timings[name]:.2f}ms" if name in timings else "-"
+                print(f"[{mark}] {name} ({timing})")
+                for row in plan:
+                    print(f"    {tuple(row)}")
+                if full_scan:
+                    failures.append(name)
+    await engine.dispose()
+    tmp.cleanup()
+
+    if failures:
+        print(f"풀 스캔이 발견된 쿼리: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+    print("모든 쿼리가 인덱스를 사용합니다.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+# 로그인 시도 제한이 요청 하나에 더하는 시간
+#
+# LoginRateLimiter.check(로그인 요청마다 한 번 호출)와 저장소의 hit 를 여러 번 불러 호출당 평균/p99 시간을 잰다.
+# 같은 계정/IP 를 반복하는 경우와, 매번 다른 키라 버킷이 쌓이고 정리(prune)되는 경우를 나눠 본다.
+#
+# 사용법: python benchmarks/ratelimit_overhead.py [--calls 200000] [--redis-url redis://localhost:6379]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+
+async def measure(name: str, calls: int, run) -> dict:
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await run(i)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    latencies.sort()
+    return {
+        "name": name,
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+async def bench_store(label: str, store, calls: int) -> list:
+    from controller.ratelimit import LoginRateLimiter
+
+    # 한도에 걸리지 않도록 충분히 큰 값을 준다. 거부되면 예외 처리 비용이 섞인다.
+    limiter = LoginRateLimiter(store, user_attempts=10**9, user_window=1, ip_attempts=10**9, ip_window=1)
+    return [
+        await measure(f"{label} hit (같은 키)", calls, lambda i: store.hit("user:same", 10**9, 10**9)),
+        await measure(f"{label} hit (다른 키)", calls, lambda i: store.hit(f"user:{i}", 10**9, 10**9)),
+        await measure(f"{label} check (로그인 1회)", calls, lambda i: limiter.check(f"user{i % 1000}", f"10.0.{i % 256}.1")),
+    ]
+
+async def main():
+    parser = argparse.ArgumentParser(description="로그인 시도 제한 호출당 비용")
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "ratelimit")
+    os.environ.setdefault("MYSQL_URL", "sqlite+aiosqlite://")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    from controller.ratelimit import MemoryRateLimitStore, RedisRateLimitStore
+
+    results = await bench_store("memory", MemoryRateLimitStore(), args.calls)
+    if args.redis_url:
+        from redis.asyncio import Redis
+        redis = Redis.from_url(args.redis_url)
+        # 네트워크 왕복이 있으므로 호출 수를 줄인다.
+        results += await bench_store("redis", RedisRateLimitStore(redis), max(1, args.calls // 20))
+        await redis.aclose()
+
+    for result in results:
+        print(f"{result['name']:28s} mean {result['mean_us']:7.2f}us  p50 {result['p50_us']:7.2f}us  p99 {result['p99_us']:7.2f}us")
+
+if __name__ == "__main__":
+    asyncio.run(main())
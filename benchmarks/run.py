@@ -0,0 +1,184 @@
+# 다섯 가지 버전의 메모 앱을 같은 부하로 측정하는 벤치마크
+#
+# 각 앱을 로컬 SQLite 로 띄운 뒤 회원가입, 로그인, 메모 CRUD 부하를 비동기로 보내고
+# 처리량, p50/p95/p99 지연 시간, 서버 메모리(RSS)를 JSON 으로 저장한다.
+#
+# 사용법: python benchmarks/run.py --users 20 --operations 50 --output bench.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER = os.path.join(ROOT, "benchmarks", "launcher.py")
+
+VERSIONS = {
+    "1.MEMO_SYNC": "main:app",
+    "2.MEMO_SYNC_MVC": "main:app",
+    "3.MEMO_ASYNC_MVC": "main:app",
+    "4.MEMO_ASYNC_MVC_PLUS": "main:application",
+    "5.MEMO_ASYNC_MVC_PLUS": "main:application",
+}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def read_rss_kb(pid: int) -> dict:
+    # 리눅스에서만 측정한다. VmHWM 은 최대 RSS.
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list] = {}
+        self.errors: dict[str, int] = {}
+
+    async def call(self, name: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+
+async def user_session(base_url: str, index: int, operations: int, recorder: Recorder):
+    username = f"bench{index}_{random.randrange(1 << 30)}"
+    password = "benchmark-password"
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        signup = await recorder.call("signup", client.post("/signup/", json={"username": username, "email": f"{username}@example.com", "password": password}))
+        login = await recorder.call("login", client.post("/login/", json={"username": username, "password": password}))
+        # 로그인하지 못하면 메모 요청이 모두 401 이 되어 의미 없는 수치가 나오므로 멈춘다.
+        if any(response is None or response.status_code >= 400 for response in (signup, login)):
+            return
+
+        memo_ids = []
+        for i in range(operations):
+            op = random.choices(["create", "list", "update", "delete"], weights=[4, 3, 2, 1])[0]
+            if op in ("update", "delete") and not memo_ids:
+                op = "create"
+            if op == "create":
+                response = await recorder.call("create", client.post("/memos/", json={"title": f"memo {i}", "content": "benchmark " * 20}))
+                if response is not None and response.status_code == 200:
+                    memo_id = response.json().get("id")
+                    if memo_id is not None:
+                        memo_ids.append(memo_id)
+            elif op == "list":
+                await recorder.call("list", client.get("/memos/"))
+            elif op == "update":
+                memo_id = random.choice(memo_ids)
+                await recorder.call("update", client.put(f"/memos/{memo_id}", json={"title": f"updated {i}"}))
+            else:
+                memo_id = memo_ids.pop(random.randrange(len(memo_ids)))
+                await recorder.call("delete", client.delete(f"/memos/{memo_id}"))
+
+async def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"앱이 시작하지 못했습니다. (exit code {process.returncode})")
+            try:
+                await client.get("/about")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("앱이 제시간에 준비되지 않았습니다.")
+
+async def bench_version(version: str, target: str, users: int, operations: int) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        process = subprocess.Popen([sys.executable, LAUNCHER, os.path.join(ROOT, version), target, db_path, str(port)])
+        try:
+            await wait_ready(base_url, process)
+            recorder = Recorder()
+            start = time.perf_counter()
+            await asyncio.gather(*(user_session(base_url, i, operations, recorder) for i in range(users)))
+            elapsed = time.perf_counter() - start
+            memory = read_rss_kb(process.pid)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    auth_errors = recorder.errors.get("signup", 0) + recorder.errors.get("login", 0)
+    return {
+        "version": version,
+        "failed": f"회원가입/로그인 실패 {auth_errors}건" if auth_errors else None,
+        "elapsed_s": elapsed,
+        "memory_kb": memory,
+        "total": summarize(all_latencies, sum(recorder.errors.values()), elapsed),
+        "operations": {
+            name: summarize(values, recorder.errors.get(name, 0), elapsed)
+            for name, values in recorder.latencies.items()
+        },
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="메모 앱 버전별 벤치마크")
+    parser.add_argument("--versions", nargs="*", default=list(VERSIONS), choices=list(VERSIONS))
+    parser.add_argument("--users", type=int, default=20, help="동시 사용자 수")
+    parser.add_argument("--operations", type=int, default=50, help="사용자당 메모 요청 수")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = []
+    for version in args.versions:
+        print(f"[{version}] 측정 중...", flush=True)
+        result = await bench_version(version, VERSIONS[version], args.users, args.operations)
+        total = result["total"]
+        if result["failed"]:
+            print(f"[{version}] 실패: {result['failed']}")
+            results.append(result)
+            continue
+        print(f"[{version}] {total['throughput']:.1f} req/s, p50 {total['p50_ms']:.1f}ms, p95 {total['p95_ms']:.1f}ms, p99 {total['p99_ms']:.1f}ms, errors {total['errors']}")
+        results.append(result)
+
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump({"users": args.users, "operations": args.operations, "results": results}, output, ensure_ascii=False, indent=2)
+    print(f"결과를 {args.output} 에 저장했습니다.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+# 메모 검색 지연 시간과 코퍼스 크기 (/memos/search 의 두 백엔드)
+#
+# 사용자 한 명에게 메모를 크기별로 넣고 model.search 의 인덱스로 검색한다.
+#   - memory: InvertedSearchIndex. 첫 검색에서 DB 를 읽어 역색인을 만드는 시간(cold)과 그 뒤 검색(warm)을 따로 잰다.
+#   - fulltext: FullTextSearchIndex (MySQL FULLTEXT). --url 로 MySQL 을 줄 때만 잰다.
+# 검색어는 자주 나오는 단어와 드문 단어를 섞은 1~2 단어다. 크기마다 p50/p99 를 출력한다.
+# MySQL URL 은 비어 있는 벤치마크 전용 DB 를 가리켜야 한다(마이그레이션을 적용하고 데이터를 남긴다).
+#
+# 사용법: python benchmarks/search.py [--sizes 1000 10000 100000] [--queries 200] [--url mysql+aiomysql://...]
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+# 앞쪽 단어일수록 자주 나온다.
+VOCABULARY = [f"word{i}" for i in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=words))
+
+def summarize(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+async def seed(database, username: str, size: int, rng: random.Random) -> int:
+    from sqlalchemy import insert, select
+    from model.databases.models import Memo, User
+
+    async with database.session() as db:
+        await db.execute(insert(User).values(username=username, email=f"{username}@example.com", hashed_password="x"))
+        user_id = (await db.execute(select(User.id).where(User.username == username))).scalar_one()
+        for start in range(0, size, 5000):
+            await db.execute(insert(Memo), [
+                {"user_id": user_id, "title": make_text(rng, 4), "content": make_text(rng, 60)}
+                for _ in range(start, min(start + 5000, size))
+            ])
+        await db.commit()
+    return user_id
+
+async def timed_searches(database, index, user_id: int, queries: list) -> list:
+    latencies = []
+    for q in queries:
+        async with database.read_session_factory()() as db:
+            start = time.perf_counter()
+            await index.search(db, user_id, q, 0, 20)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+async def bench_size(url: str, size: int, queries: int, fulltext: bool) -> dict:
+    from model.databases import migrations
+    from model.databases.mysql import Database
+    from model.search import FullTextSearchIndex, InvertedSearchIndex
+    from settings import Settings
+
+    rng = random.Random(size)
+    database = Database(Settings(mysql_url=url))
+    async with database.engine.begin() as conn:
+        await conn.run_sync(migrations.upgrade)
+    user_id = await seed(database, f"search{size}_{int(time.time())}", size, rng)
+    words = [VOCABULARY[rank] for rank in (0, 1, 5, 50, 500, 4000)]
+    sample = [" ".join(rng.sample(words, rng.choice((1, 2)))) for _ in range(queries)]
+
+    results = {}
+    index = InvertedSearchIndex(max_docs=size * 2, ttl=3600)
+    # 첫 검색은 역색인을 만든다.
+    cold = await timed_searches(database, index, user_id, sample[:1])
+    results["memory"] = {"cold_ms": cold[0], **summarize(await timed_searches(database, index, user_id, sample))}
+    if fulltext:
+        results["fulltext"] = summarize(await timed_searches(database, FullTextSearchIndex(), user_id, sample))
+    await database.dispose()
+    return results
+
+async def main():
+    parser = argparse.ArgumentParser(description="코퍼스 크기별 메모 검색 지연 시간")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000], help="사용자 한 명의 메모 수")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", help="MySQL URL. 주면 이 DB 에서 memory 와 fulltext 를 모두 잰다.")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ.setdefault("MYSQL_URL", f"sqlite+aiosqlite:///{os.path.join(tmp.name, 'search.db')}")
+    os.environ.setdefault("SECRET_KEY", "search")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    if not args.url:
+        print("--url 로 MySQL 을 주지 않아 SQLite 에서 memory 백엔드만 잽니다.")
+    for size in args.sizes:
+        url = args.url or f"sqlite+aiosqlite:///{os.path.join(tmp.name, f'search{size}.db')}"
+        result = await bench_size(url, size, args.queries, fulltext=bool(args.url))
+        memory = result["memory"]
+        line = (f"메모 {size:>7}개  memory: 색인 생성 {memory['cold_ms']:8.1f}ms, "
+                f"검색 p50 {memory['p50_ms']:6.2f}ms p99 {memory['p99_ms']:6.2f}ms")
+        if "fulltext" in result:
+            line += f"  |  fulltext: p50 {result['fulltext']['p50_ms']:6.2f}ms p99 {result['fulltext']['p99_ms']:6.2f}ms"
+        print(line, flush=True)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+# 세션 미들웨어가 요청 하나에 더하는 시간
+#
+# 세션만 읽거나 쓰는 빈 ASGI 앱을 미들웨어로 감싸 HTTP 없이 직접 호출한다.
+#   - none: 미들웨어 없음 (기준값)
+#   - cookie: 서명 쿠키 SessionMiddleware (SESSION_BACKEND=cookie)
+#   - server-memory: ServerSessionMiddleware + MemorySessionStore
+#   - server-redis: ServerSessionMiddleware + RedisSessionStore. --redis-url 이 없으면 fakeredis 를 쓴다.
+# 로그인한 사용자가 세션을 읽기만 하는 요청(TTL 만 연장)과 매번 세션을 바꾸는 요청을 나눠 호출당 평균/p50/p99 를 출력한다.
+# fakeredis 는 네트워크 왕복이 없으므로 실제 Redis 보다 빠르게 나온다.
+#
+# 사용법: python benchmarks/session_overhead.py [--requests 20000] [--redis-url redis://localhost:6379]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS")
+
+async def endpoint(scope, receive, send):
+    session = scope.get("session")
+    if session is not None:
+        if scope["path"] == "/write":
+            session["counter"] = session.get("counter", 0) + 1
+        else:
+            session.get("username")
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def call(app, path: str, cookie: bytes | None) -> list:
+    headers = [(b"host", b"bench")]
+    if cookie:
+        headers.append((b"cookie", cookie))
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "headers": headers, "scheme": "http", "server": ("bench", 80), "client": ("127.0.0.1", 1), "root_path": ""}
+    response_headers = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response_headers.extend(message["headers"])
+
+    await app(scope, receive, send)
+    return response_headers
+
+async def login_cookie(app) -> bytes | None:
+    """세션에 username 을 넣는 요청을 한 번 보내고 받은 쿠키를 돌려준다."""
+    async def login(scope, receive, send):
+        scope["session"]["username"] = "bench"
+        await endpoint(scope, receive, send)
+
+    app.app = login
+    headers = await call(app, "/login", None)
+    app.app = endpoint
+    for name, value in headers:
+        if name.lower() == b"set-cookie":
+            return value.split(b";", 1)[0]
+    return None
+
+async def measure(app, path: str, cookie: bytes | None, requests: int) -> dict:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call(app, path, cookie)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="세션 미들웨어 요청당 비용")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--redis-url", help="주지 않으면 fakeredis 로 Redis 저장소를 잰다")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "session-overhead")
+    os.environ.setdefault("MYSQL_URL", "sqlite+aiosqlite://")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+
+    from starlette.middleware.sessions import SessionMiddleware
+    from session import MemorySessionStore, RedisSessionStore, ServerSessionMiddleware
+
+    ttl = 14 * 24 * 60 * 60
+    if args.redis_url:
+        from redis.asyncio import Redis
+        redis = Redis.from_url(args.redis_url)
+    else:
+        from fakeredis import FakeAsyncRedis
+        redis = FakeAsyncRedis()
+    # 미들웨어 없는 기준값은 세션이 없으므로 읽기/쓰기가 같은 일을 한다.
+    apps = {
+        "none": endpoint,
+        "cookie": SessionMiddleware(endpoint, secret_key="session-overhead"),
+        "server-memory": ServerSessionMiddleware(endpoint, MemorySessionStore(ttl=ttl), max_age=ttl),
+        "server-redis": ServerSessionMiddleware(endpoint, RedisSessionStore(redis, ttl=ttl), max_age=ttl),
+    }
+
+    print(f"요청 {args.requests}회, {'redis' if args.redis_url else 'fakeredis'}")
+    for name, app in apps.items():
+        cookie = await login_cookie(app) if name != "none" else None
+        for label, path in (("읽기", "/read"), ("쓰기", "/write")):
+            result = await measure(app, path, cookie, args.requests)
+            print(f"  {name:14s} {label}  mean {result['mean_us']:7.2f}us  p50 {result['p50_us']:7.2f}us  p99 {result['p99_us']:7.2f}us")
+    await redis.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+# 메모 목록 템플릿(memos.html)의 콜드 스타트와 렌더링 비용
+#
+# 콜드 스타트: 새 프로세스에서 템플릿을 불러와 첫 페이지를 렌더링하기까지 걸리는 시간(jinja2 import 제외).
+#   - 예전 방식: 바이트코드 캐시 없는 동기 Environment (요청마다 Jinja2Templates 를 쓰던 것과 같이 매번 파싱)
+#   - 공유 환경: templating.py 와 같은 설정, 바이트코드 캐시가 빈 경우와 이미 채워진 경우
+# 렌더링: 메모 1000개 페이지를 render(동기)와 render_async 로 여러 번 렌더링한 평균/p99.
+#
+# 사용법: python benchmarks/templates.py [--memos 1000] [--renders 200] [--starts 10]
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(ROOT, "5.MEMO_ASYNC_MVC_PLUS", "templates")
+
+COLD_START = """
+import asyncio, json, sys, time
+import jinja2
+
+template_dir, cache_dir, use_async, memos = sys.argv[1], sys.argv[2], sys.argv[3] == "1", int(sys.argv[4])
+context = {"memos": [{"id": i, "title": f"memo {i}"} for i in range(memos)], "next_cursor": None, "username": "bench"}
+start = time.perf_counter()
+environment = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(template_dir),
+    autoescape=True,
+    enable_async=use_async,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+    auto_reload=False,
+)
+template = environment.get_template("memos.html")
+loaded = time.perf_counter()
+html = asyncio.run(template.render_async(context)) if use_async else template.render(context)
+rendered = time.perf_counter()
+print(json.dumps({"load_ms": (loaded - start) * 1000, "first_render_ms": (rendered - start) * 1000}))
+"""
+
+def cold_start(cache_dir: str, use_async: bool, memos: int, starts: int) -> dict:
+    samples = []
+    for _ in range(starts):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START, TEMPLATE_DIR, cache_dir, "1" if use_async else "0", str(memos)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        samples.append(json.loads(output))
+    return {key: statistics.median(sample[key] for sample in samples) for key in ("load_ms", "first_render_ms")}
+
+def summarize(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+async def render_cost(memos: int, renders: int) -> dict:
+    import jinja2
+
+    context = {"memos": [{"id": i, "title": f"memo {i}"} for i in range(memos)], "next_cursor": None, "username": "bench"}
+    results = {}
+    for use_async in (False, True):
+        environment = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATE_DIR), autoescape=True, enable_async=use_async)
+        template = environment.get_template("memos.html")
+        latencies = []
+        for _ in range(renders):
+            start = time.perf_counter()
+            if use_async:
+                await template.render_async(context)
+            else:
+                template.render(context)
+            latencies.append((time.perf_counter() - start) * 1000)
+        results["render_async" if use_async else "render"] = summarize(latencies)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="memos.html 콜드 스타트와 렌더링 비용")
+    parser.add_argument("--memos", type=int, default=1000)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--starts", type=int, default=10, help="콜드 스타트 측정 프로세스 수 (중앙값)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(f"콜드 스타트 (프로세스 {args.starts}개 중앙값, 메모 {args.memos}개)")
+        old = cold_start("", False, args.memos, args.starts)
+        # 빈 캐시는 매번 새 디렉터리로 잰다. 채워진 캐시는 한 번 렌더링해 둔 디렉터리로 잰다.
+        empty = [cold_start(tempfile.mkdtemp(dir=cache_dir), True, args.memos, 1) for _ in range(args.starts)]
+        empty = {key: statistics.median(sample[key] for sample in empty) for key in ("load_ms", "first_render_ms")}
+        warm_dir = tempfile.mkdtemp(dir=cache_dir)
+        cold_start(warm_dir, True, args.memos, 1)
+        warm = cold_start(warm_dir, True, args.memos, args.starts)
+        for name, result in (("예전 방식 (캐시 없음, 동기)", old), ("공유 환경 (빈 캐시, async)", empty), ("공유 환경 (캐시 채워짐, async)", warm)):
+            print(f"  {name:32s} 템플릿 로드 {result['load_ms']:6.2f}ms  첫 렌더링까지 {result['first_render_ms']:6.2f}ms")
+
+    print(f"렌더링 {args.renders}회 (메모 {args.memos}개)")
+    for name, result in asyncio.run(render_cost(args.memos, args.renders)).items():
+        print(f"  {name:12s} mean {result['mean_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms")
+
+if __name__ == "__main__":
+    main()
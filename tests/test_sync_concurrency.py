@@ -0,0 +1,79 @@
+# 1.MEMO_SYNC, 2.MEMO_SYNC_MVC 의 블로킹 DB 작업이 스레드풀에서 실행되어,
+# 느린 요청 여러 개를 동시에 보내도 하나씩 차례로 처리되지 않는지 확인한다.
+#
+# benchmarks/launcher.py 로 앱을 SQLite 에 띄우고, memo 테이블 SELECT 마다 time.sleep 을 넣어 느린 쿼리를 흉내 낸다.
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS = os.path.join(ROOT, "benchmarks")
+sys.path.insert(0, BENCHMARKS)
+
+from run import free_port, wait_ready
+
+SLOW_SECONDS = 0.5
+REQUESTS = 5
+
+SLOW_LAUNCHER = f"""
+import sys, time
+sys.path.insert(0, {BENCHMARKS!r})
+import sqlalchemy
+from sqlalchemy import event
+
+create_engine = sqlalchemy.create_engine
+
+def slow_engine(url, **kwargs):
+    engine = create_engine(url, **kwargs)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def slow_select(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM memo" in statement:
+            time.sleep({SLOW_SECONDS})
+    return engine
+
+# launcher 가 이 함수를 감싸 URL 만 SQLite 로 바꾼다.
+sqlalchemy.create_engine = slow_engine
+import launcher
+launcher.main()
+"""
+
+async def single_and_parallel(version: str, db_path: str) -> tuple[float, float]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen([sys.executable, "-c", SLOW_LAUNCHER, os.path.join(ROOT, version), "main:app", db_path, str(port)])
+    try:
+        await wait_ready(base_url, process)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            password = "concurrency-password"
+            await client.post("/signup/", json={"username": "slow", "email": "slow@example.com", "password": password})
+            response = await client.post("/login/", json={"username": "slow", "password": password})
+            assert response.status_code == 200, response.text
+            # 목록 페이지는 설치된 Starlette 와 TemplateResponse 호출 방식이 맞지 않아 JSON 을 주는 수정 API 를 쓴다.
+            ids = [(await client.post("/memos/", json={"title": f"memo {i}", "content": "c"})).json()["id"] for i in range(REQUESTS + 1)]
+
+            start = time.perf_counter()
+            response = await client.put(f"/memos/{ids[-1]}", json={"title": "single"})
+            single = time.perf_counter() - start
+            assert response.status_code == 200, response.text
+
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.put(f"/memos/{memo_id}", json={"title": "parallel"}) for memo_id in ids[:REQUESTS]))
+            parallel = time.perf_counter() - start
+        assert [response.status_code for response in responses] == [200] * REQUESTS
+        return single, parallel
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+@pytest.mark.parametrize("version", ["1.MEMO_SYNC", "2.MEMO_SYNC_MVC"])
+def test_slow_requests_run_in_parallel(version, tmp_path):
+    single, parallel = asyncio.run(single_and_parallel(version, str(tmp_path / "sync.db")))
+    assert single >= SLOW_SECONDS
+    # 차례로 처리하면 single 의 REQUESTS 배가 걸린다.
+    assert parallel < single * REQUESTS / 2, (single, parallel)